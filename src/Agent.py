@@ -1,6 +1,18 @@
-from smolagents import CodeAgent, MCPClient, OpenAIServerModel, DuckDuckGoSearchTool, LiteLLMModel
+from smolagents import CodeAgent, MCPClient, OpenAIServerModel, DuckDuckGoSearchTool, LiteLLMModel, tool
 import os
+import json
+import time
+import functools
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+import httpx
+import litellm
 from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 load_dotenv()
 
@@ -8,16 +20,55 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY environment variable not set")
 
-# Initialize Gemini model for smolagents
+# Shared keep-alive connection pool so LLM calls reuse TCP/TLS connections across agent steps
+# (HTTP/2 is used when the optional 'h2' package is installed)
+shared_http_client = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=32),
+        retries=2,
+    ),
+    timeout=60,
+)
+litellm.client_session = shared_http_client
+
+# Initialize Gemini models for smolagents: Flash by default, Pro for escalated queries
 gemini_model = OpenAIServerModel(
-    model_id="gemini-2.5-pro",  # Use Gemini 2.5 Flash (or other models like gemini-2.5-pro)
+    model_id="gemini-2.5-flash",
+    api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
+    api_key=GEMINI_API_KEY,
+    client_kwargs={"http_client": shared_http_client},
+)
+
+gemini_model_pro = OpenAIServerModel(
+    model_id="gemini-2.5-pro",
     api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
-    api_key=GEMINI_API_KEY
+    api_key=GEMINI_API_KEY,
+    client_kwargs={"http_client": shared_http_client},
 )
 
+# Queries that ask for in-depth work are escalated to the Pro model
+ESCALATION_KEYWORDS = ("deep analysis", "in-depth", "in depth", "detailed analysis", "thorough", "research")
+ESCALATION_TOKEN_THRESHOLD = 4000
+
+def pick_model(user_input: str):
+    """Pick Flash for short / non-research queries and Pro when the query needs escalation"""
+    # Rough token estimate (~4 characters per token) of the prompt, the only conversation text the model is sent
+    if len(user_input) // 4 > ESCALATION_TOKEN_THRESHOLD:
+        return gemini_model_pro
+    
+    query = user_input.lower()
+    if any(keyword in query for keyword in ESCALATION_KEYWORDS):
+        return gemini_model_pro
+    return gemini_model
+
 model = LiteLLMModel(
-    model_id="ollama/qwen3:1.7b",
+    model_id="ollama/qwen3:1.7b-q4_K_M",
     api_base="http://localhost:11434",
+    # Tight context window to keep the KV cache small
+    num_ctx=int(os.getenv("OLLAMA_NUM_CTX", "8192")),
+    # Keep the model loaded so Ollama can reuse the KV cache of the unchanged system prompt prefix
+    keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
 )
 
 model.flatten_messages_as_text = True
@@ -31,7 +82,7 @@ Provide comprehensive, detailed, and actionable responses that go beyond simple
 📊 AVAILABLE TOOLS:
 - DATABASE: list_tables(), get_table_schema(), execute_select_query(), get_sample_data(), analyze_table_relationships(), get_table_statistics()
 - YOUTUBE: get_transcript(url) - Extract and analyze video transcripts
-- WEB: visit_webpage(url) - Get and analyze web content
+- WEB: visit_webpage(url) - Get and analyze web content; visit_webpages(urls) for several pages at once
 - ANALYSIS: Advanced analytical tools for data insights
 
 🎥 YOUTUBE VIDEO ANALYSIS PROTOCOL:
@@ -88,32 +139,241 @@ When analyzing YouTube videos, follow this comprehensive approach:
 Remember: Your goal is to provide maximum value through detailed, insightful analysis that helps users understand and apply the information effectively.
 """
 
+MCP_SERVER_URL = "http://127.0.0.1:8000/mcp"
+
+@functools.lru_cache(maxsize=1)
+def connect_mcp(url: str):
+    """Connect to the MCP server once per URL and return the client with its tool manifest"""
+    server_parameters = {"url": url, "transport": "streamable-http"}
+    client = MCPClient(server_parameters)
+    return client, client.get_tools()
+
+# Process-local MCP health, updated passively (on connect and on successful tool calls)
+# so the UI can render the status without probing the server
+HEALTH = {"status": "unknown", "tools": 0, "ts": 0}
+
+def update_health(status: str, tools: int = None):
+    """Record the latest MCP health observation"""
+    HEALTH["status"] = status
+    if tools is not None:
+        HEALTH["tools"] = tools
+    HEALTH["ts"] = time.time()
+
 # Initialize MCP client and get tools with fallback
 try:
-    server_parameters = {"url": "http://127.0.0.1:8000/mcp", "transport": "streamable-http"}
-    mcp_client = MCPClient(server_parameters)
-    
     print("🔗 Connecting to MCP server...")
-    tools = mcp_client.get_tools()
+    mcp_client, tools = connect_mcp(MCP_SERVER_URL)
     print(f"✅ Retrieved {len(tools)} tools from MCP server")
+    update_health("success", len(tools))
     
 except Exception as mcp_error:
     print(f"⚠️ MCP server connection failed: {mcp_error}")
     print("🔄 Using fallback mode with base tools only...")
     tools = []
     mcp_client = None
+    update_health("basic", 0)
+
+# Maximum number of tool calls dispatched concurrently (1 keeps the original sequential behaviour)
+TOOL_CONCURRENCY_LIMIT = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "1"))
+
+# Per-tool timeouts (seconds) for parallel dispatch, so one hung call doesn't hold up the whole turn
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "15"))
+TOOL_TIMEOUTS = {
+    "get_transcript": 30,
+    "visit_webpage": 20,
+    "visit_webpages": 30,
+    "execute_select_query": 30,
+}
+
+class BatchingMCPClient:
+    """Sends independent MCP tool calls to the server in a single batch_execute request"""
+    
+    def __init__(self, mcp_tools: list, max_concurrent: int = 8):
+        self.tool_names = {t.name for t in mcp_tools}
+        self.batch_tool = next((t for t in mcp_tools if t.name == "batch_execute"), None)
+        self.max_concurrent = max_concurrent
+    
+    def can_batch(self, tool_calls: list) -> bool:
+        """Whether every call targets an MCP tool and the server supports batching"""
+        return (
+            self.batch_tool is not None
+            and len(tool_calls) > 1
+            and all(name in self.tool_names for name, _ in tool_calls)
+        )
+    
+    def execute(self, tool_calls: list) -> list:
+        """Run (tool_name, arguments) pairs in one round-trip and return results in order"""
+        calls = [
+            {"tool": name, "arguments": arguments, "timeout": TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT)}
+            for name, arguments in tool_calls
+        ]
+        raw = self.batch_tool(calls=calls, max_concurrent=self.max_concurrent)
+        results = orjson.loads(raw) if orjson else json.loads(raw)
+        if not isinstance(results, list) or len(results) != len(tool_calls):
+            raise ValueError("Malformed batch_execute response")
+        return results
+
+class ParallelToolExecutor:
+    """Dispatches independent tool calls concurrently, preserving result order"""
+    
+    def __init__(self, max_workers: int = 1, batch_client: BatchingMCPClient = None):
+        self.tools = {}
+        self.batch_client = batch_client
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+    
+    def _invoke(self, name: str, arguments: dict):
+        """Invoke a single tool"""
+        tool_obj = self.tools.get(name)
+        if tool_obj is None:
+            raise ValueError(f"Unknown tool '{name}'")
+        result = tool_obj(**arguments)
+        
+        if self.batch_client is not None and name in self.batch_client.tool_names:
+            update_health("success")
+        return result
+    
+    def _call(self, name: str, arguments: dict):
+        """Invoke a single tool, returning an error string instead of raising"""
+        try:
+            return self._invoke(name, arguments)
+        except Exception as e:
+            return f"Error in {name}: {e}"
+    
+    def execute(self, tool_calls: list, stop_on_error: bool = False) -> list:
+        """
+        Run a list of (tool_name, arguments) pairs and return results in the same order.
+        
+        Calls that exceed their timeout are reported as errors instead of blocking the turn;
+        with stop_on_error, calls still running when another one fails are skipped. Python
+        threads cannot be interrupted, so such calls still run to completion in the background.
+        """
+        # The server enforces the per-call timeouts, but stop_on_error needs the calls dispatched here
+        if not stop_on_error and self.batch_client is not None and self.batch_client.can_batch(tool_calls):
+            try:
+                results = self.batch_client.execute(tool_calls)
+                update_health("success")
+                return results
+            except Exception as e:
+                print(f"⚠️ Batch execution failed, falling back to individual calls: {e}")
+        
+        if self._pool is None or len(tool_calls) < 2:
+            return [self._call(name, arguments) for name, arguments in tool_calls]
+        
+        start = time.monotonic()
+        futures = [self._pool.submit(self._invoke, name, arguments) for name, arguments in tool_calls]
+        
+        failed = False
+        if stop_on_error:
+            deadline = max(TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT) for name, _ in tool_calls)
+            wait(futures, timeout=deadline, return_when=FIRST_EXCEPTION)
+            failed = any(future.done() and future.exception() is not None for future in futures)
+        
+        results = []
+        for (name, _), future in zip(tool_calls, futures):
+            timeout = TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT)
+            if failed and not future.done():
+                future.cancel()
+                results.append(f"Error: {name} was skipped because another tool call failed")
+                continue
+            try:
+                results.append(future.result(timeout=max(0, start + timeout - time.monotonic())))
+            except FuturesTimeoutError:
+                future.cancel()
+                results.append(
+                    f"Error: {name} timed out after {timeout:g}s. "
+                    "Some tools timed out; you may retry them or proceed with the other results."
+                )
+            except Exception as e:
+                results.append(f"Error in {name}: {e}")
+        return results
+    
+    def shutdown(self):
+        """Release the worker threads"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
 
-# Create agent with the MCP tools - simplified single agent approach
-agent = CodeAgent(
-    name="SmolAgent",
-    tools=tools, 
-    model=gemini_model, 
-    add_base_tools=True,
-    description="You are SmolAgent, an intelligent AI assistant specialized in database operations, YouTube video analysis, and web research. You provide comprehensive, detailed analysis and actionable insights.",
+parallel_executor = ParallelToolExecutor(
+    max_workers=TOOL_CONCURRENCY_LIMIT,
+    batch_client=BatchingMCPClient(tools, max_concurrent=TOOL_CONCURRENCY_LIMIT) if tools else None,
 )
 
-# Modify the system prompt after initialization
-agent.prompt_templates["system_prompt"] = agent.prompt_templates["system_prompt"] + "\n\n" + custom_instructions
+@tool
+def run_tools_in_parallel(calls: list, stop_on_error: bool = False) -> list:
+    """
+    Run several independent tool calls at the same time and return their results in order.
+    Use this when a task needs multiple tools whose inputs do not depend on each other,
+    e.g. fetching a YouTube transcript and a webpage in the same step.
+
+    Args:
+        calls: List of dicts of the form {"tool": "<tool name>", "arguments": {<keyword arguments>}}.
+        stop_on_error: If True, skip the calls still running as soon as one call fails.
+    """
+    return parallel_executor.execute(
+        [(call["tool"], call.get("arguments", {})) for call in calls],
+        stop_on_error=stop_on_error
+    )
+
+parallel_tools = [run_tools_in_parallel] if TOOL_CONCURRENCY_LIMIT > 1 else []
+
+# Agents share the MCP tools; each run builds its own on the model picked for it
+def build_agent(model) -> CodeAgent:
+    """Create an agent on the given model with the shared tools and the custom system prompt"""
+    new_agent = CodeAgent(
+        name="SmolAgent",
+        tools=tools + parallel_tools, 
+        model=model, 
+        add_base_tools=True,
+        description="You are SmolAgent, an intelligent AI assistant specialized in database operations, YouTube video analysis, and web research. You provide comprehensive, detailed analysis and actionable insights.",
+    )
+    
+    # Modify the system prompt after initialization.
+    # The system prompt is built once and never changes between turns or steps, so it forms a
+    # byte-identical prefix on every request and is served from Gemini's implicit prompt cache.
+    # Anything per-request must go into the task, never into this prompt.
+    new_agent.prompt_templates["system_prompt"] = new_agent.prompt_templates["system_prompt"] + "\n\n" + custom_instructions
+    return new_agent
+
+agent = build_agent(gemini_model)
+
+# Expose every other agent tool to the parallel executor
+parallel_executor.tools = {name: t for name, t in agent.tools.items() if name != "run_tools_in_parallel"}
+
+def agent_for_query(user_input: str) -> CodeAgent:
+    """A new agent on the model picked for this query.
+    
+    Each run gets its own agent, so concurrent runs (one per UI session) never share
+    the model choice, memory or interrupt flag; the tools and HTTP clients are shared.
+    """
+    return build_agent(pick_model(user_input))
+
+def run_agent(user_input: str, **kwargs):
+    """Run the agent with the model picked for this query"""
+    return agent_for_query(user_input).run(user_input, **kwargs)
+
+def reload_mcp_tools() -> int:
+    """Reconnect to the MCP server and reload its tools; runs started afterwards use the new tool set"""
+    global mcp_client, tools, agent
+    old_client = mcp_client
+    connect_mcp.cache_clear()
+    try:
+        mcp_client, tools = connect_mcp(MCP_SERVER_URL)
+        update_health("success", len(tools))
+    except Exception as e:
+        print(f"⚠️ MCP server reconnection failed: {e}")
+        mcp_client, tools = None, []
+        update_health("basic", 0)
+    
+    if old_client is not None:
+        try:
+            old_client.disconnect()
+        except Exception as e:
+            print(f"Warning: Error closing MCP client: {e}")
+    
+    parallel_executor.batch_client = BatchingMCPClient(tools, max_concurrent=TOOL_CONCURRENCY_LIMIT) if tools else None
+    agent = build_agent(gemini_model)
+    parallel_executor.tools = {name: t for name, t in agent.tools.items() if name != "run_tools_in_parallel"}
+    return len(tools)
 
 def run_interactive_mode():
     """Run the interactive command-line mode"""
@@ -129,11 +389,14 @@ def run_interactive_mode():
             if not input_query:
                 continue
             try:
-                result = agent.run(input_query)
+                result = run_agent(input_query)
                 print(f"\n🤖 Answer: {result}\n")
             except Exception as e:
                 print(f"❌ Error: {e}\n")
     finally:
+        parallel_executor.shutdown()
+        shared_http_client.close()
+        
         # Properly disconnect the MCP client at the end
         if 'mcp_client' in locals() and mcp_client is not None:
             try:
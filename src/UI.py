@@ -4,23 +4,58 @@ import os
 import sys
 from datetime import datetime
 import json
+import collections
 import re
+import hashlib
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
-from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add the current directory to Python path to import the agent
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Load environment variables
-load_dotenv()
+from formatting import HTML_ESCAPES, render_markdown
+from memory_cache import LRUCache
 
-# Initialize the agent (import after path setup)
-try:
-    from ageent import agent, mcp_client
-    AGENT_AVAILABLE = True
-except ImportError as e:
-    st.error(f"Failed to import agent: {e}")
-    AGENT_AVAILABLE = False
+@st.cache_resource
+def get_agent_loaded() -> threading.Event:
+    """Process-wide flag set once the agent has finished loading"""
+    return threading.Event()
+
+@st.cache_resource(show_spinner=False)
+def get_agent():
+    """Import and initialize the agent on first use, so the UI paints before heavy imports"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    from ageent import agent, mcp_client, agent_for_query
+    get_agent_loaded().set()
+    return agent, mcp_client, agent_for_query
+
+def _warm():
+    """Load the agent and open the MCP / Gemini connections before the first query"""
+    try:
+        _, mcp_client, _ = get_agent()
+        if mcp_client:
+            from ageent import update_health
+            update_health("success", len(mcp_client.get_tools()))
+        
+        # 1-token throwaway request to establish the TLS session with the Gemini API
+        from ageent import gemini_model
+        gemini_model.generate(
+            [{"role": "user", "content": [{"type": "text", "text": "ping"}]}],
+            max_tokens=1
+        )
+        print("✅ Agent warm-up complete")
+    except Exception as e:
+        print(f"⚠️ Agent warm-up failed: {e}")
 
 # Page configuration
 st.set_page_config(
@@ -30,8 +65,17 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Warm up connections in the background while the user is typing (once per session)
+if not st.session_state.get("warmed"):
+    st.session_state.warmed = True
+    # No script run context: cache_resource is process-wide, and the thread must never draw into a run
+    threading.Thread(target=_warm, daemon=True).start()
+
 # Modern UI Design
-st.markdown("""
+@st.cache_resource
+def _css() -> str:
+    """Stylesheet for the app, built once per process"""
+    return """
 <style>
     /* Import modern fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=JetBrains+Mono&display=swap');
@@ -514,65 +558,324 @@ st.markdown("""
         border: 1px solid rgba(239, 68, 68, 0.2);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_css(), unsafe_allow_html=True)
+
+# Chat history is bounded so long sessions don't grow without limit
+MAX_MESSAGES = 200
 
 # Initialize session state
 if 'messages' not in st.session_state:
-    st.session_state.messages = []
-if 'current_transcript' not in st.session_state:
-    st.session_state.current_transcript = ""
+    st.session_state.messages = collections.deque(maxlen=MAX_MESSAGES)
+if 'message_seq' not in st.session_state:
+    st.session_state.message_seq = 0
+if 'transcripts' not in st.session_state:
+    st.session_state.transcripts = {}  # Transcript text keyed by the id of the message it came with
+if 'current_transcript_id' not in st.session_state:
+    st.session_state.current_transcript_id = None
 if 'current_video_url' not in st.session_state:
     st.session_state.current_video_url = ""
+if 'pending_future' not in st.session_state:
+    st.session_state.pending_future = None
+if 'pending_stop' not in st.session_state:
+    st.session_state.pending_stop = None  # Stop flag of this session's in-flight run
+if 'pending_run' not in st.session_state:
+    st.session_state.pending_run = None  # Agent of this session's in-flight run
+if 'agent_available' not in st.session_state:
+    st.session_state.agent_available = True  # Optimistic until the first import fails
 
+def add_message(role: str, content: str) -> int:
+    """Append a chat message to the bounded history and return its id"""
+    st.session_state.message_seq += 1
+    message_id = st.session_state.message_seq
+    st.session_state.messages.append({"id": message_id, "role": role, "content": content, "ts": time.time()})
+    
+    # Drop transcripts whose messages fell out of the history
+    live_ids = {message.get("id") for message in st.session_state.messages}
+    for transcript_id in list(st.session_state.transcripts):
+        if transcript_id not in live_ids:
+            del st.session_state.transcripts[transcript_id]
+    return message_id
+
+def _stop_run(stop: threading.Event, run):
+    """Stop an in-flight run: its steps stop being forwarded and its agent halts before the next step"""
+    stop.set()
+    run.interrupt()
+
+# Cancel this session's in-flight agent run; each run has its own agent, so other sessions are unaffected
+if st.session_state.get("cancel_run") and st.session_state.pending_future is not None:
+    if st.session_state.pending_stop is not None:
+        _stop_run(st.session_state.pending_stop, st.session_state.pending_run)
+    st.session_state.pending_future.cancel()
+    st.session_state.pending_future = None
+    st.session_state.pending_stop = None
+    st.session_state.pending_run = None
+    add_message("assistant", "Run cancelled.")
+
+# YouTube video URL in a user query
+YT_URL_RE = re.compile(r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([\w-]+)', re.IGNORECASE)
+
+# Transcript body following any of the known transcript headers, in a single scan
+TRANSCRIPT_RE = re.compile(
+    r'(?:Transcript for YouTube Video:.*?\n\n'
+    r'|Full Transcript \(Single Paragraph\):\n'
+    r'|transcript:\s*'
+    r'|Video ID:.*?Word Count:.*?\n\n)'
+    r'(.*?)(?=\n\n|$)',
+    re.DOTALL | re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=512)
 def format_response(response: str) -> str:
-    """Format the agent response with proper styling"""
-    # Code blocks
-    response = re.sub(r'```(\w+)?\n(.*?)```', r'<div class="code-block">\2</div>', response, flags=re.DOTALL)
+    """Format a finished message with proper styling, cached across reruns.
     
-    # Headers
-    response = re.sub(r'^# (.*)', r'<h2 style="color: #e2e8f0; margin: 1.5rem 0 0.75rem 0; font-size: 1.5rem;">\1</h2>', response, flags=re.MULTILINE)
-    response = re.sub(r'^## (.*)', r'<h3 style="color: #e2e8f0; margin: 1.25rem 0 0.5rem 0; font-size: 1.25rem;">\1</h3>', response, flags=re.MULTILINE)
-    response = re.sub(r'^### (.*)', r'<h4 style="color: #e2e8f0; margin: 1rem 0 0.5rem 0; font-size: 1.1rem;">\1</h4>', response, flags=re.MULTILINE)
-    
-    # Lists
-    response = re.sub(r'^- (.*)', r'<li style="margin-bottom: 0.5rem; color: #cbd5e1;">\1</li>', response, flags=re.MULTILINE)
-    response = re.sub(r'(<li.*?</li>)', r'<ul style="margin: 0.5rem 0; padding-left: 1.5rem;">\1</ul>', response)
-    
-    # Bold and italic
-    response = re.sub(r'\*\*(.*?)\*\*', r'<strong style="color: #f1f5f9;">\1</strong>', response)
-    response = re.sub(r'\*(.*?)\*', r'<em>\1</em>', response)
-    
-    return response
+    Partial output while streaming goes through render_markdown directly, so the
+    ever-growing buffers don't evict the history messages this cache is for.
+    """
+    return render_markdown(response)
 
 def extract_transcript_from_response(response: str) -> str:
     """Extract transcript from agent response"""
-    patterns = [
-        r'Transcript for YouTube Video:.*?\n\n(.*?)(?=\n\n|$)',
-        r'Full Transcript \(Single Paragraph\):\n(.*?)(?=\n\n|$)',
-        r'transcript:\s*(.*?)(?=\n\n|$)',
-        r'Video ID:.*?Word Count:.*?\n\n(.*?)(?=\n\n|$)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, response, re.DOTALL | re.IGNORECASE)
-        if match:
-            transcript = match.group(1).strip()
-            if len(transcript) > 100:
-                return transcript
+    # Headers can precede short metadata blocks, so skip matches that are too short
+    for match in TRANSCRIPT_RE.finditer(response):
+        transcript = match.group(1).strip()
+        if len(transcript) > 100:
+            return transcript
     return ""
 
+# Streaming flush cadence: re-render at most every 25 ms or every 8 KB of new text
+STREAM_FLUSH_INTERVAL = 0.025
+STREAM_FLUSH_BYTES = 8192
+
+def extract_step_text(step) -> str:
+    """Extract displayable text from a streamed agent step"""
+    # Token deltas (when the model streams its outputs)
+    content = getattr(step, "content", None)
+    if isinstance(content, str):
+        return content
+    
+    # Completed reasoning / action steps
+    model_output = getattr(step, "model_output", None)
+    if isinstance(model_output, str) and model_output:
+        return model_output + "\n\n"
+    return ""
+
+def get_final_answer(step):
+    """Return the final answer carried by a streamed step, or None"""
+    if type(step).__name__ == "FinalAnswerStep":
+        return getattr(step, "output", getattr(step, "final_answer", None))
+    return None
+
+@st.cache_data(ttl=30)
+def _tool_count() -> int:
+    """Number of MCP tools, cached so reruns don't query the client"""
+    _, mcp_client, _ = get_agent()
+    return len(mcp_client.get_tools())
+
+# Seconds after which the MCP health observation is refreshed by a probe
+HEALTH_STALE_AFTER = 60
+
 def get_agent_status():
     """Get current agent and MCP status"""
-    if not AGENT_AVAILABLE:
+    if not st.session_state.agent_available:
         return "error", "Agent offline"
     
-    if mcp_client:
+    # Don't wait on the agent import just to render the badge
+    if not get_agent_loaded().is_set():
+        return "warning", "Connecting..."
+    
+    from ageent import HEALTH, update_health
+    
+    # Probe only when the passively updated health is stale
+    if time.time() - HEALTH["ts"] > HEALTH_STALE_AFTER and HEALTH["status"] != "basic":
         try:
-            tools = mcp_client.get_tools()
-            return "success", f"{len(tools)} tools ready"
-        except:
-            return "warning", "Limited tools"
-    return "warning", "Basic mode"
+            update_health("success", _tool_count())
+        except Exception:
+            update_health("limited")
+    
+    if HEALTH["status"] == "success":
+        return "success", f"{HEALTH['tools']} tools ready"
+    if HEALTH["status"] == "basic":
+        return "warning", "Basic mode"
+    return "warning", "Limited tools"
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Worker pool for agent runs, shared across reruns"""
+    return ThreadPoolExecutor(max_workers=4)
+
+_STREAM_END = object()
+
+# Longest an agent run may take before the UI stops it
+AGENT_RUN_TIMEOUT = float(os.getenv("AGENT_RUN_TIMEOUT", "600"))
+
+def _pump_agent_stream(run, user_input: str, steps: queue.Queue, stop: threading.Event):
+    """Run the agent on a worker thread, forwarding streamed steps to the queue until stopped"""
+    stream = None
+    try:
+        stream = run.run(user_input, stream=True)
+        for step in stream:
+            if stop.is_set():
+                break
+            steps.put(step)
+    finally:
+        if stream is not None:
+            stream.close()  # Ends the run at the current step when stopped early
+        steps.put(_STREAM_END)
+
+def _end_stream_ui(indicator, placeholder):
+    """Clear the streaming widgets and this session's in-flight run.
+    
+    Not called when a rerun (e.g. a Cancel click) interrupts the script, so the
+    cancel handler at the top of the next run still finds the run to stop.
+    """
+    indicator.empty()
+    placeholder.empty()
+    st.session_state.pending_future = None
+    st.session_state.pending_stop = None
+    st.session_state.pending_run = None
+
+def stream_agent_run(user_input: str) -> str:
+    """Run the agent, streaming intermediate steps into a placeholder, and return the final answer"""
+    placeholder = st.empty()
+    buf = ""
+    last_len = 0
+    last_flush = time.monotonic()
+    response = None
+    
+    # The agent runs on a worker thread; the script thread only polls for progress
+    steps = queue.Queue()
+    stop = threading.Event()
+    _, _, agent_for_query = get_agent()
+    run = agent_for_query(user_input)
+    future = get_executor().submit(_pump_agent_stream, run, user_input, steps, stop)
+    st.session_state.pending_future = future
+    st.session_state.pending_stop = stop
+    st.session_state.pending_run = run
+    st.button("⏹️ Cancel", key="cancel_run")
+    indicator = st.empty()
+    started = time.monotonic()
+    
+    # Stream intermediate steps so the user sees progress before the run completes
+    while True:
+        # Checked on every pass, since a run that keeps streaming never leaves the queue empty
+        now = time.monotonic()
+        if now - started > AGENT_RUN_TIMEOUT:
+            _stop_run(stop, run)
+            _end_stream_ui(indicator, placeholder)
+            raise TimeoutError(f"The agent did not finish within {AGENT_RUN_TIMEOUT:g}s")
+        
+        try:
+            step = steps.get(timeout=0.1)
+        except queue.Empty:
+            # Streamlit only acts on a Cancel click (a rerun) at st calls, so make one on every poll
+            indicator.caption(f"⏳ Working... {now - started:.0f}s")
+            continue
+        if step is _STREAM_END:
+            break
+        
+        final_answer = get_final_answer(step)
+        if final_answer is not None:
+            response = final_answer
+            continue
+        
+        buf += extract_step_text(step)
+        now = time.monotonic()
+        if now - last_flush > STREAM_FLUSH_INTERVAL or len(buf) - last_len >= STREAM_FLUSH_BYTES:
+            placeholder.markdown(f"""
+            <div class="message message-assistant">
+                <div class="message-content">
+                    <div class="message-bubble">
+                        {render_markdown(buf)}
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            last_flush = now
+            last_len = len(buf)
+    
+    _end_stream_ui(indicator, placeholder)
+    future.result()  # Re-raise errors from the worker thread
+    return str(response if response is not None else buf)
+
+# Prompt cache for repeated URL queries (e.g. the same YouTube URL during development).
+# Database questions and other queries whose answers follow live data always run the agent.
+PROMPT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".agentarium", "llm_cache")
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "86400"))
+# Most answers kept by the in-memory fallback cache
+PROMPT_CACHE_MAX_ENTRIES = 256
+# A URL anywhere in a user query
+URL_RE = re.compile(r'https?://\S+', re.IGNORECASE)
+
+@st.cache_resource
+def get_prompt_cache():
+    """Open the prompt cache, on disk when diskcache is installed, otherwise a bounded in-memory LRU"""
+    try:
+        from diskcache import Cache
+        return Cache(PROMPT_CACHE_DIR, size_limit=2**30)
+    except ImportError:
+        return LRUCache(PROMPT_CACHE_MAX_ENTRIES)
+
+def cached_agent_run(user_input: str):
+    """Run the agent, serving repeated URL queries from the prompt cache.
+    
+    Returns the response and the YouTube transcript found in it ("" when there is none).
+    """
+    if not URL_RE.search(user_input):
+        return str(stream_agent_run(user_input)), ""
+    
+    cache = get_prompt_cache()
+    # Only whitespace is normalized: URLs (e.g. YouTube video IDs) are case-sensitive
+    key = hashlib.blake2b(" ".join(user_input.split()).encode()).hexdigest()
+    
+    entry = cache.get(key)
+    if entry is not None:
+        entry = orjson.loads(entry) if orjson else json.loads(entry)
+        print(f"cache_hit=True tokens_saved_estimate={entry['tokens_saved_estimate']}")
+        return entry["response"], entry.get("transcript", "")
+    
+    response = str(stream_agent_run(user_input))
+    entry = {
+        "response": response,
+        "transcript": extract_transcript_from_response(response) if YT_URL_RE.search(user_input) else "",
+        "tokens_saved_estimate": len(response) // 4,
+    }
+    cache.set(key, orjson.dumps(entry) if orjson else json.dumps(entry).encode(), expire=PROMPT_CACHE_TTL)
+    return response, entry["transcript"]
+
+@functools.lru_cache(maxsize=4096)
+def _fmt_ts(ts: float) -> str:
+    """Format a message timestamp for display"""
+    return datetime.fromtimestamp(ts).strftime("%I:%M %p")
+
+def _render_message(message: Dict[str, Any]) -> str:
+    """Build the HTML for a single chat message"""
+    # Messages from older sessions have no stored timestamp
+    timestamp = _fmt_ts(message.setdefault("ts", time.time()))
+    
+    if message["role"] == "user":
+        return f"""
+        <div class="message message-user">
+            <div class="message-content">
+                <div class="message-bubble">
+                    {message["content"].translate(HTML_ESCAPES)}
+                </div>
+                <div class="message-time">{timestamp}</div>
+            </div>
+        </div>
+        """
+    
+    return f"""
+        <div class="message message-assistant">
+            <div class="message-content">
+                <div class="message-bubble">
+                    {format_response(message["content"])}
+                </div>
+                <div class="message-time">{timestamp}</div>
+            </div>
+        </div>
+        """
 
 # Header
 status_type, status_text = get_agent_status()
@@ -591,16 +894,8 @@ st.markdown(f"""
         </div>
     </div>
 </div>
-""", unsafe_allow_html=True)
-
-# Main chat wrapper
-st.markdown('<div class="chat-wrapper">', unsafe_allow_html=True)
-
-# Chat area
-st.markdown('<div class="chat-area">', unsafe_allow_html=True)
-
-# Messages container
-st.markdown('<div class="messages-container">', unsafe_allow_html=True)
+<div class="chat-wrapper"><div class="chat-area"><div class="messages-container">
+""", unsafe_allow_html=True)  # Header, then open chat-wrapper, chat-area and messages-container
 
 if not st.session_state.messages:
     # Welcome message
@@ -629,39 +924,14 @@ if not st.session_state.messages:
     </div>
     """, unsafe_allow_html=True)
 else:
-    # Display messages
-    for i, message in enumerate(st.session_state.messages):
-        timestamp = datetime.now().strftime("%I:%M %p")
-        
-        if message["role"] == "user":
-            st.markdown(f"""
-            <div class="message message-user">
-                <div class="message-content">
-                    <div class="message-bubble">
-                        {message["content"]}
-                    </div>
-                    <div class="message-time">{timestamp}</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            formatted_content = format_response(message["content"])
-            st.markdown(f"""
-            <div class="message message-assistant">
-                <div class="message-content">
-                    <div class="message-bubble">
-                        {formatted_content}
-                    </div>
-                    <div class="message-time">{timestamp}</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+    # Display messages in a single markdown element
+    st.markdown(
+        "".join(_render_message(message) for message in st.session_state.messages),
+        unsafe_allow_html=True
+    )
 
-st.markdown('</div>', unsafe_allow_html=True)  # Close messages-container
-
-# Input area
-st.markdown('<div class="input-area">', unsafe_allow_html=True)
-st.markdown('<div class="input-container">', unsafe_allow_html=True)
+# Close messages-container, open input area
+st.markdown('</div><div class="input-area"><div class="input-container">', unsafe_allow_html=True)
 
 # Check for example query
 default_query = ""
@@ -689,13 +959,12 @@ with st.form("chat_form", clear_on_submit=True):
         submit_button = st.form_submit_button("Send", use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
-st.markdown('</div></div>', unsafe_allow_html=True)  # Close input-container and input-area
-
-st.markdown('</div>', unsafe_allow_html=True)  # Close chat-area
-
-# Transcript panel (only show if there's content)
-if st.session_state.current_transcript and len(st.session_state.current_transcript.strip()) > 0:
-    st.markdown(f"""
+# Close input-container, input-area and chat-area, then the transcript panel
+# (only if there's content) and close chat-wrapper, all in one element
+transcript_panel = ""
+current_transcript = st.session_state.transcripts.get(st.session_state.current_transcript_id, "")
+if current_transcript and len(current_transcript.strip()) > 0:
+    transcript_panel = f"""
     <div class="transcript-panel">
         <div class="transcript-header">
             <div class="transcript-title">
@@ -703,16 +972,24 @@ if st.session_state.current_transcript and len(st.session_state.current_transcri
             </div>
         </div>
         <div class="transcript-content">
-            {st.session_state.current_transcript}
+            {current_transcript.translate(HTML_ESCAPES)}
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+st.markdown(f'</div></div></div>{transcript_panel}</div>', unsafe_allow_html=True)
 
-st.markdown('</div>', unsafe_allow_html=True)  # Close chat-wrapper
+# Load the agent on the first submit
+if submit_button and user_input and st.session_state.agent_available:
+    try:
+        get_agent()
+    except Exception as e:
+        st.session_state.agent_available = False
+        st.error(f"Failed to import agent: {e}")
 
 # Process user input
-if submit_button and user_input and AGENT_AVAILABLE:
-    st.session_state.messages.append({"role": "user", "content": user_input})
+if submit_button and user_input and st.session_state.agent_available:
+    add_message("user", user_input)
     
     with st.spinner(""):
         # Show typing indicator
@@ -727,28 +1004,27 @@ if submit_button and user_input and AGENT_AVAILABLE:
         start_time = time.time()
         
         try:
-            response = agent.run(user_input)
+            response, transcript = cached_agent_run(user_input)
             response_time = time.time() - start_time
             
-            # Extract transcript if YouTube video
-            if "youtube.com" in user_input.lower() or "youtu.be" in user_input.lower():
-                transcript = extract_transcript_from_response(str(response))
-                if transcript:
-                    st.session_state.current_transcript = transcript
-                    url_match = re.search(r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]+)', user_input)
-                    if url_match:
-                        st.session_state.current_video_url = url_match.group(0)
+            message_id = add_message("assistant", response)
+            
+            # Keep the transcript if YouTube video
+            url_match = YT_URL_RE.search(user_input)
+            if url_match and transcript:
+                st.session_state.transcripts[message_id] = transcript
+                st.session_state.current_transcript_id = message_id
+                st.session_state.current_video_url = url_match.group(0)
             
-            st.session_state.messages.append({"role": "assistant", "content": str(response)})
             st.success(f"✅ Response in {response_time:.1f}s")
             
         except Exception as e:
-            st.session_state.messages.append({"role": "assistant", "content": f"I encountered an error: {str(e)}"})
+            add_message("assistant", f"I encountered an error: {str(e)}")
             st.error(f"❌ Error: {str(e)}")
     
     st.rerun()
 
-elif submit_button and user_input and not AGENT_AVAILABLE:
+elif submit_button and user_input and not st.session_state.agent_available:
     st.error("❌ Agent is not available. Please check the configuration.")
 
 # Action buttons
@@ -757,13 +1033,28 @@ st.markdown("""
     <button class="action-btn" onclick="if(confirm('Clear all messages?')) { window.location.href = '?clear=true'; }">
         🗑️ Clear
     </button>
+    <button class="action-btn" onclick="window.location.href = '?refresh_tools=true';">
+        🔄 Refresh tools
+    </button>
 </div>
 """, unsafe_allow_html=True)
 
 # Handle clear action
 if st.query_params.get("clear") == "true":
-    st.session_state.messages = []
-    st.session_state.current_transcript = ""
+    st.session_state.messages = collections.deque(maxlen=MAX_MESSAGES)
+    st.session_state.transcripts = {}
+    st.session_state.current_transcript_id = None
     st.session_state.current_video_url = ""
     st.query_params.clear()
-    st.rerun()
\ No newline at end of file
+    st.rerun()
+
+# Handle refresh tools action
+if st.query_params.get("refresh_tools") == "true":
+    if get_agent_loaded().is_set():
+        # Reconnect (re-probing health) and drop the cached agent / client references
+        from ageent import reload_mcp_tools
+        reload_mcp_tools()
+        get_agent.clear()
+    _tool_count.clear()
+    st.query_params.clear()
+    st.rerun()
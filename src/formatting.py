@@ -0,0 +1,64 @@
+"""
+Markdown to HTML rendering for agent responses in the chat UI.
+
+Kept free of Streamlit imports so the renderer can be used (and tested) on its own.
+"""
+
+import re
+
+# Characters escaped in agent text before it is embedded in HTML; NUL is reserved for code block placeholders
+HTML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", "\x00": None})
+
+# Precompiled patterns, applied in order by render_markdown
+CODE_BLOCK_RE = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
+CODE_PLACEHOLDER_RE = re.compile(r'\x00(\d+)\x00')
+HEADER_RE = re.compile(r'^(#{1,3}) (.*)$', re.MULTILINE)
+LIST_ITEM_RE = re.compile(r'^- (.*)', re.MULTILINE)
+# Run of consecutive list items (one per line), wrapped in a single <ul>
+LI_BLOCK_RE = re.compile(r'(?:<li[^>]*>.*?</li>(?:\n(?=<li))?)+')
+# Emphasis stays within a line and never spans a code block placeholder
+BOLD_RE = re.compile(r'\*\*([^\n\x00]*?)\*\*')
+ITALIC_RE = re.compile(r'\*([^\n\x00]*?)\*')
+
+# Header tag and style by number of leading '#'
+HEADER_STYLES = {
+    1: ("h2", "margin: 1.5rem 0 0.75rem 0; font-size: 1.5rem;"),
+    2: ("h3", "margin: 1.25rem 0 0.5rem 0; font-size: 1.25rem;"),
+    3: ("h4", "margin: 1rem 0 0.5rem 0; font-size: 1.1rem;"),
+}
+
+def _format_header(match: re.Match) -> str:
+    """Render a markdown header line as an HTML heading"""
+    tag, style = HEADER_STYLES[len(match.group(1))]
+    return f'<{tag} style="color: #e2e8f0; {style}">{match.group(2)}</{tag}>'
+
+def render_markdown(text: str) -> str:
+    """Render the markdown subset the agent uses as HTML, escaping everything else"""
+    text = text.translate(HTML_ESCAPES)
+
+    # Code blocks are paired over the whole text first, then swapped for placeholders
+    # so the passes below leave their contents alone
+    code_blocks = []
+
+    def stash_code(match: re.Match) -> str:
+        code_blocks.append(match.group(2))
+        return f"\x00{len(code_blocks) - 1}\x00"
+
+    text = CODE_BLOCK_RE.sub(stash_code, text)
+
+    # Headers (all levels in a single pass)
+    text = HEADER_RE.sub(_format_header, text)
+
+    # Lists
+    text = LIST_ITEM_RE.sub(r'<li style="margin-bottom: 0.5rem; color: #cbd5e1;">\1</li>', text)
+    text = LI_BLOCK_RE.sub(r'<ul style="margin: 0.5rem 0; padding-left: 1.5rem;">\g<0></ul>', text)
+
+    # Bold before italic, so '*a **b** c*' nests the bold span inside the italic one
+    text = BOLD_RE.sub(r'<strong style="color: #f1f5f9;">\1</strong>', text)
+    text = ITALIC_RE.sub(r'<em>\1</em>', text)
+
+    if not code_blocks:
+        return text
+    return CODE_PLACEHOLDER_RE.sub(
+        lambda match: f'<div class="code-block">{code_blocks[int(match.group(1))]}</div>', text
+    )
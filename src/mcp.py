@@ -7,278 +7,548 @@ Uses FastMCP to create database tools for SmolAgents with structured responses.
 
 from typing import List, Optional
 from mcp.server.fastmcp import FastMCP
-from pydantic import BaseModel, Field, field_validator
 from postgres_db import PostgreSQLManager, TableSchema, DatabaseSchema, QueryResult, SampleData
-from enum import Enum
-from youtube_transcript_api import YouTubeTranscriptApi
+from memory_cache import LRUCache
+import os
 import re
-import requests
-from requests.exceptions import RequestException
-from markdownify import markdownify
+import atexit
+import difflib
+import json
+import time
+import logging
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from functools import lru_cache, partial, wraps
+from operator import itemgetter
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Tool diagnostics go through logging, so DEBUG messages cost nothing unless enabled
+log = logging.getLogger("agentarium.mcp")
+if __name__ == "__main__":
+    # Configured before db_manager connects below, so its connection messages are shown
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(levelname)s %(name)s: %(message)s")
 
 # Create MCP server
 mcp = FastMCP("DatabaseMCP")
 
+def threaded_tool():
+    """Register a blocking tool with FastMCP as an async tool run in a worker thread.
+    
+    FastMCP calls synchronous tools directly on its event loop, so one slow
+    transcript, webpage or database call would hold up every other request.
+    The undecorated function is returned so batch_execute can still call it.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def run_in_thread(*args, **kwargs):
+            return await asyncio.to_thread(partial(fn, *args, **kwargs))
+        
+        mcp.tool()(run_in_thread)
+        return fn
+    return decorator
+
 # Initialize database manager
 db_manager = PostgreSQLManager()
 
-class QueryType(str, Enum):
-    """Supported query types"""
-    SELECT = "SELECT"
-
-class TableListResponse(BaseModel):
-    """Response model for listing tables"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    tables: List[str] = Field(default_factory=list, description="List of table names")
-    total_count: int = Field(default=0, description="Total number of tables")
-    error: Optional[str] = Field(None, description="Error message if operation failed")
+# requests, markdownify, youtube_transcript_api, selectolax and rapidfuzz are only
+# needed by individual tools, so they are imported on first use rather than at server start
+
+# Connect and read timeouts for webpage fetches, in seconds
+WEBPAGE_TIMEOUT = (3.05, 15)
+# Largest webpage body visit_webpage downloads
+WEBPAGE_MAX_BYTES = 5 << 20
+# Most pages visit_webpages fetches at the same time, over the shared session's connection pool
+WEBPAGE_MAX_CONCURRENT = 8
+
+@lru_cache(maxsize=1)
+def _http_session():
+    """Shared HTTP session so repeated webpage fetches reuse pooled keep-alive connections"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Error: {self.error}"
-        
-        if not self.tables:
-            return "No tables found in the database"
-        
-        response = f"Found {self.total_count} tables in the database:\n"
-        for i, table in enumerate(self.tables, 1):
-            response += f"{i}. {table}\n"
-        
-        return response.strip()
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # requests already advertises gzip/deflate (and br when brotli is installed) and decodes them
+    session.headers["User-Agent"] = "Agentarium/1.0"
+    atexit.register(session.close)
+    return session
+
+# Rendered webpages, revalidated with the server's ETag / Last-Modified before reuse
+WEBPAGE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".agentarium", "webpages")
+# Most pages kept by the in-memory fallback cache; each can hold up to WEBPAGE_MAX_BYTES of Markdown
+WEBPAGE_CACHE_MAX_ENTRIES = 64
+
+def _detect_encoding(body: bytes) -> str:
+    """Guess the charset of a body served without one, defaulting to UTF-8"""
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return "utf-8"
+    best = from_bytes(bytes(body)).best()
+    return best.encoding if best else "utf-8"
+
+@lru_cache(maxsize=1)
+def _webpage_cache():
+    """Open the webpage cache, on disk when diskcache is installed, otherwise a bounded in-memory LRU"""
+    try:
+        from diskcache import Cache
+        return Cache(WEBPAGE_CACHE_DIR, size_limit=256 << 20)
+    except ImportError:
+        return LRUCache(WEBPAGE_CACHE_MAX_ENTRIES)
+
+@lru_cache(maxsize=1)
+def _html_parser():
+    """selectolax's lexbor HTML parser, imported on first use; None when selectolax is not installed"""
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        return None
+    return LexborHTMLParser
+
+@lru_cache(maxsize=1)
+def _rapidfuzz():
+    """RapidFuzz's (fuzz, process) modules, imported on first use; None when rapidfuzz is not installed"""
+    try:
+        from rapidfuzz import fuzz, process
+    except ImportError:
+        return None
+    return fuzz, process
+
+@lru_cache(maxsize=1)
+def _get_yt_api():
+    """The YouTube transcript API, imported on first use"""
+    from youtube_transcript_api import YouTubeTranscriptApi
+    return YouTubeTranscriptApi
+
+# Schema cache: catalog lookups are round-trips to Postgres, and schemas rarely
+# change within an agent session. Entries are {key: (timestamp, schema version, value)}
+# and only count as fresh while db_manager still reports the same schema version.
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "60"))
+_schema_cache = {}
+
+def _schema_version():
+    """db_manager's current schema version, or None if it can't be read"""
+    try:
+        return db_manager.current_schema_version()
+    except Exception as e:
+        log.debug("Schema version check failed: %s", e)
+        return None
+
+def _cache_get(key, version):
+    """Return a fresh cached value for this schema version, or None"""
+    entry = _schema_cache.get(key)
+    if entry and version is not None and entry[1] == version and time.monotonic() - entry[0] < SCHEMA_CACHE_TTL:
+        return entry[2]
+    return None
+
+def _cached_table_list() -> List[str]:
+    """db_manager.list_tables() behind the schema cache"""
+    version = _schema_version()
+    tables = _cache_get("tables", version)
+    if tables is None:
+        tables = db_manager.list_tables()
+        # An empty list is also what a failed lookup returns, so don't keep it
+        if tables:
+            _schema_cache["tables"] = (time.monotonic(), version, tables)
+    return tables
+
+def _cached_schema(table_name: str) -> TableSchema:
+    """db_manager.get_table_schema() behind the schema cache"""
+    version = _schema_version()
+    schema = _cache_get(("table", table_name), version)
+    if schema is None:
+        schema = db_manager.get_table_schema(table_name)
+        if schema.columns:
+            _schema_cache[("table", table_name)] = (time.monotonic(), version, schema)
+    return schema
+
+def _cached_db_schema() -> DatabaseSchema:
+    """db_manager.get_database_schema() behind the schema cache, also seeding the per-table entries"""
+    version = _schema_version()
+    db_schema = _cache_get("database", version)
+    if db_schema is None:
+        db_schema = db_manager.get_database_schema()
+        now = time.monotonic()
+        if db_schema.tables:
+            _schema_cache["database"] = (now, version, db_schema)
+            _schema_cache["tables"] = (now, version, list(db_schema.tables))
+        for table_name, table_schema in db_schema.tables.items():
+            if table_schema.columns:
+                _schema_cache[("table", table_name)] = (now, version, table_schema)
+    return db_schema
+
+def _invalidate_schema_cache():
+    """Drop all cached schema information, here and in db_manager"""
+    _schema_cache.clear()
+    db_manager.invalidate_schema_cache()
+
+# Precompiled patterns used by the tools
+# YouTube video ID from watch, embed, shorts, /v/, live and youtu.be URLs, in a single pass
+_YT_ID_RE = re.compile(
+    r'(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:[^#\s]*&)?v=|embed/|shorts/|v/|live/)|youtu\.be/)'
+    r'([0-9A-Za-z_-]{11})(?![0-9A-Za-z_-])'
+)
+_FROM_TABLE_RE = re.compile(r'FROM\s+(\w+)', re.IGNORECASE)
+# Postgres 'column "x" does not exist' errors, matched in one scan
+_COLUMN_MISSING_RE = re.compile(r'column.*does not exist', re.IGNORECASE | re.DOTALL)
+# Whitespace-delimited words, counted without building a list of them
+_WORD_RE = re.compile(r'\S+')
+
+# Substrings of a lowercased column type used to classify it in suggest_useful_queries
+NUMERIC_TYPE_MARKERS = ('int', 'float', 'decimal', 'numeric')
+DATE_TYPE_MARKERS = ('date', 'time', 'timestamp')
+
+# HTML to Markdown on the selectolax DOM (parsed in C); markdownify is the fallback
+_HTML_SKIP_TAGS = {"head", "script", "style", "noscript", "template", "svg", "iframe"}
+_HTML_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "footer", "nav", "aside",
+    "figure", "form", "table", "dl", "dt", "dd",
+}
+_HTML_WRAP_TAGS = {"strong": "**", "b": "**", "em": "*", "i": "*", "code": "`"}
+_INLINE_SPACE_RE = re.compile(r'\s+')
+_TRAILING_SPACE_RE = re.compile(r'[ \t]+\n')
+_MULTI_NL_RE = re.compile(r'\n{3,}')
+
+def _emit_markdown(node, parts: List[str], depth: int = 0):
+    """Append the Markdown for the children of a selectolax node to parts; depth is the list nesting level"""
+    for child in node.iter(include_text=True):
+        tag = child.tag
+        if tag == "-text":
+            text = _INLINE_SPACE_RE.sub(" ", child.text(deep=False))
+            # Collapsed whitespace must not indent the start of a line
+            if not parts or parts[-1].endswith("\n"):
+                text = text.lstrip()
+            parts.append(text)
+        elif tag in _HTML_SKIP_TAGS:
+            continue
+        elif tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            parts.append(f"\n\n{'#' * int(tag[1])} ")
+            _emit_markdown(child, parts, depth)
+            parts.append("\n\n")
+        elif tag in _HTML_BLOCK_TAGS:
+            parts.append("\n\n")
+            _emit_markdown(child, parts, depth)
+            parts.append("\n\n")
+        elif tag == "tr":
+            cells = []
+            header = True
+            for cell in child.iter(include_text=False):
+                if cell.tag in ("td", "th"):
+                    inner = []
+                    _emit_markdown(cell, inner, depth)
+                    cells.append(_INLINE_SPACE_RE.sub(" ", "".join(inner)).strip().replace("|", "\\|"))
+                    header = header and cell.tag == "th"
+            if cells:
+                parts.append("\n| " + " | ".join(cells) + " |")
+                if header:
+                    parts.append("\n|" + " --- |" * len(cells))
+        elif tag == "blockquote":
+            inner = []
+            _emit_markdown(child, inner, depth)
+            text = _MULTI_NL_RE.sub("\n\n", _TRAILING_SPACE_RE.sub("\n", "".join(inner))).strip()
+            if text:
+                parts.append("\n\n" + "\n".join(f"> {line}".rstrip() for line in text.split("\n")) + "\n\n")
+        elif tag in ("ul", "ol"):
+            # Nested lists continue their parent item; only top-level lists are set apart
+            if depth == 0:
+                parts.append("\n")
+            indent = "    " * depth
+            number = 0
+            for item in child.iter(include_text=False):
+                if item.tag == "li":
+                    number += 1
+                    parts.append(f"\n{indent}{number}. " if tag == "ol" else f"\n{indent}- ")
+                    _emit_markdown(item, parts, depth + 1)
+                elif item.tag not in _HTML_SKIP_TAGS:
+                    _emit_markdown(item, parts, depth)
+            if depth == 0:
+                parts.append("\n")
+        elif tag == "li":
+            parts.append(f"\n{'    ' * depth}- ")
+            _emit_markdown(child, parts, depth + 1)
+        elif tag == "br":
+            parts.append("\n")
+        elif tag == "img":
+            src = child.attributes.get("src")
+            if src:
+                parts.append(f"![{child.attributes.get('alt') or ''}]({src})")
+        elif tag == "pre":
+            parts.append(f"\n\n```\n{child.text(deep=True).strip(chr(10))}\n```\n\n")
+        elif tag == "a":
+            link_parts = []
+            _emit_markdown(child, link_parts, depth)
+            text = "".join(link_parts).strip()
+            href = child.attributes.get("href")
+            parts.append(f"[{text}]({href})" if text and href else text)
+        elif tag in _HTML_WRAP_TAGS:
+            inner = []
+            _emit_markdown(child, inner, depth)
+            text = "".join(inner).strip()
+            if text:
+                marker = _HTML_WRAP_TAGS[tag]
+                parts.append(f"{marker}{text}{marker}")
+        else:
+            _emit_markdown(child, parts, depth)
+
+def _markdownify(html: str) -> str:
+    """Convert with markdownify, imported only when selectolax is unavailable or fails"""
+    from markdownify import markdownify
+    return markdownify(html).strip()
+
+def html_to_markdown(html: str) -> str:
+    """Convert an HTML page to Markdown"""
+    parser = _html_parser()
+    if parser is None:
+        return _markdownify(html)
+    
+    try:
+        root = parser(html).body
+    except Exception:
+        return _markdownify(html)
+    if root is None:
+        return ""
+    parts = []
+    try:
+        _emit_markdown(root, parts)
+    except Exception as e:
+        # e.g. RecursionError on very deeply nested pages; the page text is the last resort
+        log.debug("HTML to Markdown conversion failed, falling back: %s", e)
+        try:
+            return _markdownify(html)
+        except Exception:
+            return _MULTI_NL_RE.sub("\n\n", root.text(separator="\n")).strip()
+    return _TRAILING_SPACE_RE.sub("\n", "".join(parts)).strip()
+
+# Longest SQL text execute_select_query accepts
+MAX_QUERY_LENGTH = 20000
+# Rows of a query result shown by execute_select_query
+QUERY_DISPLAY_ROWS = 10
+_SQL_SPACE = ' \t\r\n'
+
+def _is_select(sql_query: str) -> bool:
+    """Whether the query starts with the SELECT keyword, looking only at its first characters"""
+    i, n = 0, len(sql_query)
+    while i < n and sql_query[i] in _SQL_SPACE:
+        i += 1
+    if sql_query[i:i + 6].upper() != 'SELECT':
+        return False
+    return i + 6 == n or sql_query[i + 6] in _SQL_SPACE or sql_query[i + 6] in '(*'
+
+def _fuzzy_matches(term: str, choices: List[str], limit: int = 10) -> List[str]:
+    """Choices closest to term, best first; scored in C by RapidFuzz when installed"""
+    modules = _rapidfuzz()
+    if modules is not None:
+        fuzz, process = modules
+        return [name for name, _, _ in process.extract(term, choices, scorer=fuzz.WRatio, score_cutoff=70, limit=limit)]
+    return difflib.get_close_matches(term, choices, n=limit, cutoff=0.7)
+
+@lru_cache(maxsize=256)
+def _rule(width: int) -> str:
+    """Separator line of the given width, shared between calls"""
+    return '-' * width
+
+def _row_formatter(rows: list, columns: Optional[List[str]]):
+    """Pick the row formatter once; rows from a single query share a shape"""
+    if not rows or not isinstance(rows[0], dict):
+        return str
+    cols = columns or list(rows[0].keys())
+    return lambda row: " | ".join(str(row.get(col, 'NULL')) for col in cols)
+
+# Response formatting
+# The tools format the values they already hold directly; building a pydantic
+# model per call only to format and discard it is pure validation overhead.
+
+def _format_table_list(tables: List[str], error: Optional[str] = None) -> str:
+    """Format the table listing returned by list_tables"""
+    if error is not None:
+        return f"Error: {error}"
+    
+    if not tables:
+        return "No tables found in the database"
+    
+    parts = [f"Found {len(tables)} tables in the database:\n"]
+    for i, table in enumerate(tables, 1):
+        parts.append(f"{i}. {table}\n")
+    
+    return "".join(parts).strip()
 
-class TableSchemaResponse(BaseModel):
-    """Response model for table schema information"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    table_name: str = Field(..., description="Name of the table")
-    table_schema: Optional[TableSchema] = Field(None, description="Table schema information")  # Changed from 'schema' to 'table_schema'
-    error: Optional[str] = Field(None, description="Error message if operation failed")
+def _format_table_schema(table_name: str, table_schema: Optional[TableSchema], error: Optional[str] = None) -> str:
+    """Format the schema of a single table"""
+    if error is not None:
+        return f"Error getting schema for table '{table_name}': {error}"
     
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Error getting schema for table '{self.table_name}': {self.error}"
-        
-        if not self.table_schema or not self.table_schema.columns:  # Updated reference
-            return f"No schema information found for table '{self.table_name}'"
-        
-        response = f"Schema for table '{self.table_name}':\n\n"
-        response += f"Columns ({len(self.table_schema.columns)}):\n"  # Updated reference
-        
-        for col in self.table_schema.columns:  # Updated reference
-            nullable = "NULL" if col.nullable else "NOT NULL"
-            pk_indicator = " 🔑" if col.primary_key else ""
-            fk_indicator = " 🔗" if col.foreign_key else ""
-            
-            response += f"  • {col.name}: {col.type} ({nullable}){pk_indicator}{fk_indicator}\n"
-            
-            if col.default:
-                response += f"    DEFAULT: {col.default}\n"
-        
-        if self.table_schema.foreign_keys:  # Updated reference
-            response += f"\nForeign Keys ({len(self.table_schema.foreign_keys)}):\n"
-            for fk in self.table_schema.foreign_keys:
-                response += f"  • {', '.join(fk.constrained_columns)} → {fk.referred_table}.{', '.join(fk.referred_columns)}\n"
-        
-        if self.table_schema.indexes:  # Updated reference
-            response += f"\nIndexes ({len(self.table_schema.indexes)}):\n"
-            for idx in self.table_schema.indexes:
-                unique_indicator = " (UNIQUE)" if idx.unique else ""
-                response += f"  • {idx.name}: {', '.join(idx.columns)}{unique_indicator}\n"
-        
-        return response
-
-class QueryExecutionResponse(BaseModel):
-    """Response model for query execution"""
-    success: bool = Field(..., description="Whether the query was successful")
-    query: str = Field(..., description="The executed query")
-    result: Optional[QueryResult] = Field(None, description="Query execution result")
-    error: Optional[str] = Field(None, description="Error message if query failed")
-    
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Query failed: {self.error}\nQuery: {self.query}"
-        
-        if not self.result:
-            return f"Query executed but no result returned\nQuery: {self.query}"
-        
-        if not self.result.success:
-            return f"Query execution failed: {self.result.error}\nQuery: {self.query}"
-        
-        response = f"Query executed successfully"
-        if self.result.execution_time:
-            response += f" (took {self.result.execution_time:.3f}s)"
-        response += f"\nQuery: {self.query}\n\n"
-        
-        if self.result.data:
-            response += f"Results ({len(self.result.data)} rows):\n"
-            
-            # Show column headers
-            if self.result.columns:
-                headers = " | ".join(self.result.columns)
-                response += f"  {headers}\n"
-                response += f"  {'-' * len(headers)}\n"
-            
-            # Show data rows (limit to first 10)
-            for i, row in enumerate(self.result.data[:10]):
-                if isinstance(row, dict):
-                    values = " | ".join([str(row.get(col, 'NULL')) for col in (self.result.columns or row.keys())])
-                    response += f"  {values}\n"
-                else:
-                    response += f"  {row}\n"
-            
-            if len(self.result.data) > 10:
-                response += f"  ... and {len(self.result.data) - 10} more rows\n"
+    if not table_schema or not table_schema.columns:
+        return f"No schema information found for table '{table_name}'"
+    
+    parts = [
+        f"Schema for table '{table_name}':\n\n",
+        f"Columns ({len(table_schema.columns)}):\n",
+    ]
+    
+    for col in table_schema.columns:
+        nullable = "NULL" if col.nullable else "NOT NULL"
+        pk_indicator = " 🔑" if col.primary_key else ""
+        fk_indicator = " 🔗" if col.foreign_key else ""
         
-        elif self.result.rows_affected is not None:
-            response += f"Rows affected: {self.result.rows_affected}\n"
+        parts.append(f"  • {col.name}: {col.type} ({nullable}){pk_indicator}{fk_indicator}\n")
         
-        return response
+        if col.default:
+            parts.append(f"    DEFAULT: {col.default}\n")
+    
+    if table_schema.foreign_keys:
+        parts.append(f"\nForeign Keys ({len(table_schema.foreign_keys)}):\n")
+        for fk in table_schema.foreign_keys:
+            parts.append(f"  • {', '.join(fk.constrained_columns)} → {fk.referred_table}.{', '.join(fk.referred_columns)}\n")
+    
+    if table_schema.indexes:
+        parts.append(f"\nIndexes ({len(table_schema.indexes)}):\n")
+        for idx in table_schema.indexes:
+            unique_indicator = " (UNIQUE)" if idx.unique else ""
+            parts.append(f"  • {idx.name}: {', '.join(idx.columns)}{unique_indicator}\n")
+    
+    return "".join(parts)
 
-class SampleDataResponse(BaseModel):
-    """Response model for sample data"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    table_name: str = Field(..., description="Name of the table")
-    sample_data: Optional[SampleData] = Field(None, description="Sample data from the table")
-    error: Optional[str] = Field(None, description="Error message if operation failed")
+def _format_query_result(query: str, result: Optional[QueryResult], error: Optional[str] = None) -> str:
+    """Format the result of a SELECT query"""
+    if error is not None:
+        return f"Query failed: {error}\nQuery: {query}"
     
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Error getting sample data from table '{self.table_name}': {self.error}"
-        
-        if not self.sample_data or not self.sample_data.rows:
-            return f"No sample data found in table '{self.table_name}'"
-        
-        response = f"Sample data from '{self.table_name}' ({self.sample_data.total_rows_sampled} rows):\n\n"
+    if not result:
+        return f"Query executed but no result returned\nQuery: {query}"
+    
+    if not result.success:
+        return f"Query execution failed: {result.error}\nQuery: {query}"
+    
+    parts = ["Query executed successfully"]
+    if result.execution_time:
+        parts.append(f" (took {result.execution_time:.3f}s)")
+    parts.append(f"\nQuery: {query}\n\n")
+    
+    if result.data:
+        # A streamed result keeps only the displayed rows in data
+        row_count = result.row_count if result.row_count is not None else len(result.data)
+        parts.append(f"Results ({row_count} rows):\n")
         
         # Show column headers
-        if self.sample_data.columns:
-            headers = " | ".join(self.sample_data.columns)
-            response += f"  {headers}\n"
-            response += f"  {'-' * len(headers)}\n"
-        
-        # Show sample rows
-        for i, row in enumerate(self.sample_data.rows):
-            if isinstance(row, dict):
-                values = " | ".join([str(row.get(col, 'NULL')) for col in (self.sample_data.columns or row.keys())])
-                response += f"  {values}\n"
-            else:
-                response += f"  {row}\n"
-        
-        return response
-
-class DatabaseOverviewResponse(BaseModel):
-    """Response model for database overview"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    database_name: str = Field(..., description="Name of the database")
-    db_schema: Optional[DatabaseSchema] = Field(None, description="Complete database schema")  # Changed from 'schema' to 'db_schema'
-    error: Optional[str] = Field(None, description="Error message if operation failed")
-    
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Error getting database overview: {self.error}"
-        
-        if not self.db_schema:  # Updated reference
-            return f"No schema information found for database '{self.database_name}'"
-        
-        response = f"Database Overview: '{self.database_name}'\n"
-        response += f"{'-' * (len(self.database_name) + 20)}\n\n"
-        response += f"Total Tables: {self.db_schema.total_tables}\n\n"  # Updated reference
-        
-        if self.db_schema.tables:  # Updated reference
-            response += "Tables Summary:\n"
-            for table_name in self.db_schema.get_table_names():  # Updated reference
-                table = self.db_schema.get_table_by_name(table_name)  # Updated reference
-                if table:
-                    response += f"  • {table_name}: {len(table.columns)} columns"
-                    if table.primary_keys:
-                        response += f", PK: {', '.join(table.primary_keys)}"
-                    if table.foreign_keys:
-                        response += f", {len(table.foreign_keys)} FK(s)"
-                    response += "\n"
-        
-        return response
-
-class YouTubeVideo(BaseModel):
-    """Model for YouTube video information"""
-    video_id: str = Field(..., description="The YouTube video ID")
-    url: str = Field(..., description="The full YouTube video URL")
-    
-    @field_validator('video_id')
-    @classmethod
-    def validate_video_id(cls, v):
-        if not v or not re.match(r'^[A-Za-z0-9_-]{11}$', v):
-            raise ValueError("Invalid YouTube video ID format")
-        return v
-
-class VideoIdResponse(BaseModel):
-    """Response model for video ID extraction"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    video_id: Optional[str] = Field(None, description="The extracted YouTube video ID")
-    url: str = Field(..., description="The input YouTube video URL")
-    error: Optional[str] = Field(None, description="Error message if operation failed")
-    
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Error extracting video ID: {self.error}\nURL: {self.url}"
-        
-        return f"Video ID extracted successfully\nURL: {self.url}\nVideo ID: {self.video_id}"
-
-class TranscriptResponse(BaseModel):
-    """Response model for video transcript"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    video_id: str = Field(..., description="The YouTube video ID")
-    url: str = Field(..., description="The YouTube video URL")
-    transcript: Optional[str] = Field(None, description="The full video transcript text as a single paragraph")
-    word_count: Optional[int] = Field(None, description="Number of words in the transcript")
-    error: Optional[str] = Field(None, description="Error message if operation failed")
-    
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Error fetching transcript: {self.error}\nURL: {self.url}"
-        
-        if not self.transcript:
-            return f"No transcript found for video: {self.url}"
-        
-        response = f"Transcript for YouTube Video: {self.url}\n"
-        response += f"{'-' * (len(self.url) + 20)}\n\n"
-        response += f"Video ID: {self.video_id}\n"
-        response += f"Word Count: {self.word_count:,}\n\n"
-        response += "Full Transcript (Single Paragraph):\n"
-        response += f"{self.transcript}\n"
-        
-        return response.strip()
-
-class WebpageResponse(BaseModel):
-    """Response model for webpage content retrieval"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    url: str = Field(..., description="The input webpage URL")
-    content: Optional[str] = Field(None, description="The webpage content converted to Markdown")
-    error: Optional[str] = Field(None, description="Error message if operation failed")
-    
-    def get_formatted_response(self) -> str:
-        """Get formatted string response"""
-        if not self.success:
-            return f"Error fetching webpage content: {self.error}\nURL: {self.url}"
-        
-        if not self.content:
-            return f"No content retrieved for webpage: {self.url}"
-        
-        response = f"Webpage Content for: {self.url}\n"
-        response += f"{'-' * (len(self.url) + 20)}\n\n"
-        response += "Content (Markdown):\n"
-        response += f"{self.content}\n"
-        
-        return response.strip()
-
-# Enhanced MCP Tools with Pydantic responses
-
-@mcp.tool()
+        if result.columns:
+            headers = " | ".join(result.columns)
+            parts.append(f"  {headers}\n")
+            parts.append(f"  {_rule(len(headers))}\n")
+        
+        # Show data rows (limit to first QUERY_DISPLAY_ROWS)
+        fmt = _row_formatter(result.data, result.columns)
+        parts.append("\n".join("  " + fmt(row) for row in result.data[:QUERY_DISPLAY_ROWS]))
+        parts.append("\n")
+        
+        if row_count > QUERY_DISPLAY_ROWS:
+            parts.append(f"  ... and {row_count - QUERY_DISPLAY_ROWS} more rows\n")
+    
+    elif result.rows_affected is not None:
+        parts.append(f"Rows affected: {result.rows_affected}\n")
+    
+    return "".join(parts)
+
+def _format_sample_data(table_name: str, sample_data: Optional[SampleData], error: Optional[str] = None) -> str:
+    """Format sample rows from a table"""
+    if error is not None:
+        return f"Error getting sample data from table '{table_name}': {error}"
+    
+    if not sample_data or not sample_data.rows:
+        return f"No sample data found in table '{table_name}'"
+    
+    parts = [f"Sample data from '{table_name}' ({sample_data.total_rows_sampled} rows):\n\n"]
+    
+    # Show column headers
+    if sample_data.columns:
+        headers = " | ".join(sample_data.columns)
+        parts.append(f"  {headers}\n")
+        parts.append(f"  {_rule(len(headers))}\n")
+    
+    # Show sample rows
+    fmt = _row_formatter(sample_data.rows, sample_data.columns)
+    parts.append("\n".join("  " + fmt(row) for row in sample_data.rows))
+    parts.append("\n")
+    
+    return "".join(parts)
+
+def _format_database_overview(database_name: str, db_schema: Optional[DatabaseSchema], error: Optional[str] = None) -> str:
+    """Format the per-table summary of the whole database"""
+    if error is not None:
+        return f"Error getting database overview: {error}"
+    
+    if not db_schema:
+        return f"No schema information found for database '{database_name}'"
+    
+    parts = [
+        f"Database Overview: '{database_name}'\n",
+        f"{_rule(len(database_name) + 20)}\n\n",
+        f"Total Tables: {db_schema.total_tables}\n\n",
+    ]
+    
+    if db_schema.tables:
+        parts.append("Tables Summary:\n")
+        for table_name in db_schema.get_table_names():
+            table = db_schema.get_table_by_name(table_name)
+            if table:
+                parts.append(f"  • {table_name}: {len(table.columns)} columns")
+                if table.primary_keys:
+                    parts.append(f", PK: {', '.join(table.primary_keys)}")
+                if table.foreign_keys:
+                    parts.append(f", {len(table.foreign_keys)} FK(s)")
+                parts.append("\n")
+    
+    return "".join(parts)
+
+def _format_transcript(url: str, video_id: str, transcript: Optional[str], word_count: Optional[int], error: Optional[str] = None) -> str:
+    """Format a YouTube transcript with its metadata header"""
+    if error is not None:
+        return f"Error fetching transcript: {error}\nURL: {url}"
+    
+    if not transcript:
+        return f"No transcript found for video: {url}"
+    
+    parts = [
+        f"Transcript for YouTube Video: {url}\n",
+        f"{_rule(len(url) + 20)}\n\n",
+        f"Video ID: {video_id}\n",
+        f"Word Count: {word_count:,}\n\n",
+        "Full Transcript (Single Paragraph):\n",
+        f"{transcript}\n",
+    ]
+    
+    return "".join(parts).strip()
+
+def _format_webpage(url: str, content: Optional[str], error: Optional[str] = None) -> str:
+    """Format webpage content converted to Markdown"""
+    if error is not None:
+        return f"Error fetching webpage content: {error}\nURL: {url}"
+    
+    if not content:
+        return f"No content retrieved for webpage: {url}"
+    
+    parts = [
+        f"Webpage Content for: {url}\n",
+        f"{_rule(len(url) + 20)}\n\n",
+        "Content (Markdown):\n",
+        f"{content}\n",
+    ]
+    
+    return "".join(parts).strip()
+
+# Enhanced MCP Tools
+
+@threaded_tool()
 def list_tables() -> str:
     """
     Retrieves a list of all tables in the connected database.
@@ -292,27 +562,17 @@ def list_tables() -> str:
         error message if the operation fails.
     """
     try:
-        tables = db_manager.list_tables()
-        
-        response = TableListResponse(
-            success=True,
-            tables=tables,
-            total_count=len(tables)
-        )
+        tables = _cached_table_list()
         
-        print(f"DEBUG: Found {len(tables)} tables")
-        return response.get_formatted_response()
+        log.debug("Found %d tables", len(tables))
+        return _format_table_list(tables)
         
     except Exception as e:
-        print(f"ERROR in list_tables: {e}")
-        response = TableListResponse(
-            success=False,
-            error=str(e)
-        )
-        return response.get_formatted_response()
+        log.exception("ERROR in list_tables: %s", e)
+        return _format_table_list([], error=str(e))
 
 
-@mcp.tool()
+@threaded_tool()
 def get_table_schema(table_name: str) -> str:
     """
     Get comprehensive schema information for a specific table.
@@ -330,27 +590,16 @@ def get_table_schema(table_name: str) -> str:
         error message if the table is not found or the operation fails.
     """
     try:
-        schema = db_manager.get_table_schema(table_name)
+        schema = _cached_schema(table_name)
         
-        response = TableSchemaResponse(
-            success=True,
-            table_name=table_name,
-            table_schema=schema
-        )
-        
-        return response.get_formatted_response()
+        return _format_table_schema(table_name, schema)
         
     except Exception as e:
-        print(f"ERROR in get_table_schema: {e}")
-        response = TableSchemaResponse(
-            success=False,
-            table_name=table_name,
-            error=str(e)
-        )
-        return response.get_formatted_response()
+        log.exception("ERROR in get_table_schema: %s", e)
+        return _format_table_schema(table_name, None, error=str(e))
 
 
-@mcp.tool()
+@threaded_tool()
 def execute_select_query(sql_query: str) -> str:
     """
     Execute a SELECT query with comprehensive result formatting and helpful error messages.
@@ -368,18 +617,17 @@ def execute_select_query(sql_query: str) -> str:
         error message with suggestions if the query fails.
     """
     try:
-        print(f"DEBUG: Executing query: {sql_query}")
+        if len(sql_query) > MAX_QUERY_LENGTH:
+            return _format_query_result(sql_query[:200] + "...", None, error=f"Query is longer than {MAX_QUERY_LENGTH} characters")
+        
+        log.debug("Executing query: %s", sql_query)
         
         # Safety check: only allow SELECT queries
-        if not sql_query.strip().upper().startswith('SELECT'):
-            response = QueryExecutionResponse(
-                success=False,
-                query=sql_query,
-                error="Only SELECT queries are allowed for security reasons"
-            )
-            return response.get_formatted_response()
+        if not _is_select(sql_query):
+            return _format_query_result(sql_query, None, error="Only SELECT queries are allowed for security reasons")
         
-        result = db_manager.execute_query(sql_query)
+        # Only the displayed rows are kept; the rest are streamed past and counted
+        result = db_manager.execute_query(sql_query, stream=True, max_rows=QUERY_DISPLAY_ROWS)
         
         if not result.success:
             # Enhanced error handling with suggestions
@@ -387,42 +635,29 @@ def execute_select_query(sql_query: str) -> str:
             suggestions = ""
             
             # Check for common column name errors
-            if "column" in error_msg.lower() and "does not exist" in error_msg.lower():
+            if _COLUMN_MISSING_RE.search(error_msg):
                 # Extract table name from query
-                import re
-                table_match = re.search(r'FROM\s+(\w+)', sql_query, re.IGNORECASE)
+                table_match = _FROM_TABLE_RE.search(sql_query)
                 if table_match:
                     table_name = table_match.group(1)
                     suggestions = f"\n\nSUGGESTION: The column name might be incorrect. Please use get_table_schema(table_name='{table_name}') to check the exact column names available in the table."
             
             enhanced_error = f"{error_msg}{suggestions}"
             
-            response = QueryExecutionResponse(
-                success=False,
-                query=sql_query,
-                error=enhanced_error
-            )
-            return response.get_formatted_response()
-        
-        response = QueryExecutionResponse(
-            success=True,
-            query=sql_query,
-            result=result
-        )
+            return _format_query_result(sql_query, None, error=enhanced_error)
         
-        return response.get_formatted_response()
+        return _format_query_result(sql_query, result)
         
     except Exception as e:
-        print(f"ERROR in execute_select_query: {e}")
-        response = QueryExecutionResponse(
-            success=False,
-            query=sql_query,
+        log.exception("ERROR in execute_select_query: %s", e)
+        return _format_query_result(
+            sql_query,
+            None,
             error=f"Unexpected error: {str(e)}. Please check your SQL syntax and table/column names."
         )
-        return response.get_formatted_response()
 
 
-@mcp.tool()
+@threaded_tool()
 def get_sample_data(table_name: str, limit: int = 5) -> str:
     """
     Get sample data from a table with structured formatting.
@@ -446,25 +681,14 @@ def get_sample_data(table_name: str, limit: int = 5) -> str:
         
         sample_data = db_manager.get_sample_data(table_name, safe_limit)
         
-        response = SampleDataResponse(
-            success=True,
-            table_name=table_name,
-            sample_data=sample_data
-        )
-        
-        return response.get_formatted_response()
+        return _format_sample_data(table_name, sample_data)
         
     except Exception as e:
-        print(f"ERROR in get_sample_data: {e}")
-        response = SampleDataResponse(
-            success=False,
-            table_name=table_name,
-            error=str(e)
-        )
-        return response.get_formatted_response()
+        log.exception("ERROR in get_sample_data: %s", e)
+        return _format_sample_data(table_name, None, error=str(e))
 
 
-@mcp.tool()
+@threaded_tool()
 def get_database_overview() -> str:
     """
     Get a comprehensive overview of the entire database.
@@ -479,27 +703,16 @@ def get_database_overview() -> str:
         message if the operation fails.
     """
     try:
-        schema = db_manager.get_database_schema()
-        
-        response = DatabaseOverviewResponse(
-            success=True,
-            database_name=schema.database_name,
-            db_schema=schema
-        )
+        schema = _cached_db_schema()
         
-        return response.get_formatted_response()
+        return _format_database_overview(schema.database_name, schema)
         
     except Exception as e:
-        print(f"ERROR in get_database_overview: {e}")
-        response = DatabaseOverviewResponse(
-            success=False,
-            database_name="unknown",
-            error=str(e)
-        )
-        return response.get_formatted_response()
+        log.exception("ERROR in get_database_overview: %s", e)
+        return _format_database_overview("unknown", None, error=str(e))
 
 
-@mcp.tool()
+@threaded_tool()
 def analyze_table_relationships() -> str:
     """
     Analyzes and displays the relationships between tables in the database.
@@ -514,56 +727,46 @@ def analyze_table_relationships() -> str:
         message if the analysis fails.
     """
     try:
-        schema = db_manager.get_database_schema()
+        schema = _cached_db_schema()
         
         if not schema.tables:
             return "No tables found in the database"
         
-        response = f"Table Relationships Analysis\n"
-        response += f"{'-' * 35}\n\n"
+        parts = ["Table Relationships Analysis\n", f"{_rule(35)}\n\n"]
         
-        # Find all foreign key relationships
-        relationships = []
-        for table_name, table_schema in schema.tables.items():
-            for fk in table_schema.foreign_keys:
-                relationships.append({
-                    'from_table': table_name,
-                    'from_columns': fk.constrained_columns,
-                    'to_table': fk.referred_table,
-                    'to_columns': fk.referred_columns
-                })
+        # Find all foreign key relationships as (from_table, from_columns, to_table, to_columns)
+        relationships = [
+            (table_name, fk.constrained_columns, fk.referred_table, fk.referred_columns)
+            for table_name, table_schema in schema.tables.items()
+            for fk in table_schema.foreign_keys
+        ]
         
         if not relationships:
-            response += "No foreign key relationships found.\n"
+            parts.append("No foreign key relationships found.\n")
         else:
-            response += f"Found {len(relationships)} foreign key relationships:\n\n"
-            for rel in relationships:
-                response += f"  • {rel['from_table']}.{', '.join(rel['from_columns'])} → "
-                response += f"{rel['to_table']}.{', '.join(rel['to_columns'])}\n"
+            parts.append(f"Found {len(relationships)} foreign key relationships:\n\n")
+            for from_table, from_columns, to_table, to_columns in relationships:
+                parts.append(f"  • {from_table}.{', '.join(from_columns)} → {to_table}.{', '.join(to_columns)}\n")
         
         # Analyze table connectivity
-        response += f"\nTable Connectivity:\n"
-        connected_tables = set()
-        for rel in relationships:
-            connected_tables.add(rel['from_table'])
-            connected_tables.add(rel['to_table'])
-        
-        isolated_tables = set(schema.tables.keys()) - connected_tables
+        parts.append("\nTable Connectivity:\n")
+        connected_tables = {table for rel in relationships for table in (rel[0], rel[2])}
+        isolated_tables = schema.tables.keys() - connected_tables
         
         if connected_tables:
-            response += f"  • Connected tables ({len(connected_tables)}): {', '.join(sorted(connected_tables))}\n"
+            parts.append(f"  • Connected tables ({len(connected_tables)}): {', '.join(sorted(connected_tables))}\n")
         
         if isolated_tables:
-            response += f"  • Isolated tables ({len(isolated_tables)}): {', '.join(sorted(isolated_tables))}\n"
+            parts.append(f"  • Isolated tables ({len(isolated_tables)}): {', '.join(sorted(isolated_tables))}\n")
         
-        return response
+        return "".join(parts)
         
     except Exception as e:
-        print(f"ERROR in analyze_table_relationships: {e}")
+        log.exception("ERROR in analyze_table_relationships: %s", e)
         return f"Error analyzing table relationships: {str(e)}"
 
 
-@mcp.tool()
+@threaded_tool()
 def get_table_statistics(table_name: str) -> str:
     """
     Get detailed statistics for a specific table.
@@ -581,50 +784,53 @@ def get_table_statistics(table_name: str) -> str:
         message if the table is not found or the operation fails.
     """
     try:
-        # Get basic schema info
-        schema = db_manager.get_table_schema(table_name)
+        # Schema and row count over one connection; a cached schema leaves only the count to fetch
+        version = _schema_version()
+        cached = _cache_get(("table", table_name), version)
+        schema = db_manager.get_table_statistics_bundle(table_name, cached)
+        if cached is None and schema.columns:
+            _schema_cache[("table", table_name)] = (time.monotonic(), version, schema)
         
         if not schema.columns:
             return f"Table '{table_name}' not found or has no columns"
         
-        response = f"Statistics for table '{table_name}'\n"
-        response += f"{'-' * (len(table_name) + 25)}\n\n"
-        
-        # Basic info
-        response += f"Column Count: {len(schema.columns)}\n"
-        response += f"Primary Keys: {len(schema.primary_keys)}\n"
-        response += f"Foreign Keys: {len(schema.foreign_keys)}\n"
-        response += f"Indexes: {len(schema.indexes)}\n\n"
+        parts = [
+            f"Statistics for table '{table_name}'\n",
+            f"{_rule(len(table_name) + 25)}\n\n",
+            # Basic info
+            f"Column Count: {len(schema.columns)}\n",
+            f"Primary Keys: {len(schema.primary_keys)}\n",
+            f"Foreign Keys: {len(schema.foreign_keys)}\n",
+            f"Indexes: {len(schema.indexes)}\n\n",
+        ]
         
-        # Get row count
-        try:
-            count_result = db_manager.execute_query(f"SELECT COUNT(*) as row_count FROM {table_name}")
-            if count_result.success and count_result.data:
-                row_count = count_result.data[0]['row_count']
-                response += f"Total Rows: {row_count:,}\n\n"
-        except Exception as e:
-            response += f"Row count: Unable to determine ({str(e)})\n\n"
+        # Row count (a planner estimate unless the table has no statistics yet)
+        if schema.row_count is not None:
+            if schema.row_count_exact:
+                parts.append(f"Total Rows: {schema.row_count:,}\n\n")
+            else:
+                parts.append(f"Estimated Rows: ~{schema.row_count:,}\n\n")
         
         # Column details
-        response += "Column Details:\n"
+        parts.append("Column Details:\n")
         for col in schema.columns:
-            response += f"  • {col.name}:\n"
-            response += f"    - Type: {col.type}\n"
-            response += f"    - Nullable: {'Yes' if col.nullable else 'No'}\n"
+            parts.append(f"  • {col.name}:\n")
+            parts.append(f"    - Type: {col.type}\n")
+            parts.append(f"    - Nullable: {'Yes' if col.nullable else 'No'}\n")
             if col.default:
-                response += f"    - Default: {col.default}\n"
+                parts.append(f"    - Default: {col.default}\n")
             if col.primary_key:
-                response += f"    - Primary Key: Yes\n"
-            response += "\n"
+                parts.append("    - Primary Key: Yes\n")
+            parts.append("\n")
         
-        return response
+        return "".join(parts)
         
     except Exception as e:
-        print(f"ERROR in get_table_statistics: {e}")
+        log.exception("ERROR in get_table_statistics: %s", e)
         return f"Error getting statistics for table '{table_name}': {str(e)}"
 
 
-@mcp.tool()
+@threaded_tool()
 def suggest_useful_queries(table_name: str) -> str:
     """
     Suggests useful queries for exploring a specific table.
@@ -643,53 +849,63 @@ def suggest_useful_queries(table_name: str) -> str:
         error message if the table is not found or the operation fails.
     """
     try:
-        schema = db_manager.get_table_schema(table_name)
+        schema = _cached_schema(table_name)
         
         if not schema.columns:
             return f"Table '{table_name}' not found or has no columns"
         
-        response = f"Suggested Queries for '{table_name}'\n"
-        response += f"{'-' * (len(table_name) + 25)}\n\n"
-        
-        # Basic exploration queries
-        response += "Basic Exploration:\n"
-        response += f"  1. SELECT * FROM {table_name} LIMIT 10;\n"
-        response += f"  2. SELECT COUNT(*) FROM {table_name};\n"
+        parts = [
+            f"Suggested Queries for '{table_name}'\n",
+            f"{_rule(len(table_name) + 25)}\n\n",
+            # Basic exploration queries
+            "Basic Exploration:\n",
+            f"  1. SELECT * FROM {table_name} LIMIT 10;\n",
+            f"  2. SELECT COUNT(*) FROM {table_name};\n",
+        ]
         
-        # Column-specific queries
-        text_columns = [col.name for col in schema.columns if 'char' in col.type.lower() or 'text' in col.type.lower()]
-        numeric_columns = [col.name for col in schema.columns if any(t in col.type.lower() for t in ['int', 'float', 'decimal', 'numeric'])]
-        date_columns = [col.name for col in schema.columns if any(t in col.type.lower() for t in ['date', 'time', 'timestamp'])]
+        # Column-specific queries: classify each column once, keeping only as many as are shown
+        text_columns, numeric_columns, date_columns = [], [], []
+        for col in schema.columns:
+            col_type = col.type.lower()
+            if 'char' in col_type or 'text' in col_type:
+                if len(text_columns) < 3:
+                    text_columns.append(col.name)
+            elif any(t in col_type for t in NUMERIC_TYPE_MARKERS):
+                if len(numeric_columns) < 3:
+                    numeric_columns.append(col.name)
+            elif any(t in col_type for t in DATE_TYPE_MARKERS):
+                if len(date_columns) < 2:
+                    date_columns.append(col.name)
         
         if text_columns:
-            response += f"\nText Column Analysis:\n"
-            for col in text_columns[:3]:  # Show first 3 text columns
-                response += f"  • SELECT {col}, COUNT(*) FROM {table_name} GROUP BY {col} ORDER BY COUNT(*) DESC LIMIT 10;\n"
+            parts.append("\nText Column Analysis:\n")
+            for col in text_columns:  # At most 3 text columns
+                parts.append(f"  • SELECT {col}, COUNT(*) FROM {table_name} GROUP BY {col} ORDER BY COUNT(*) DESC LIMIT 10;\n")
         
         if numeric_columns:
-            response += f"\nNumeric Column Analysis:\n"
-            for col in numeric_columns[:3]:  # Show first 3 numeric columns
-                response += f"  • SELECT MIN({col}), MAX({col}), AVG({col}) FROM {table_name};\n"
+            parts.append("\nNumeric Column Analysis:\n")
+            for col in numeric_columns:  # At most 3 numeric columns
+                parts.append(f"  • SELECT MIN({col}), MAX({col}), AVG({col}) FROM {table_name};\n")
         
         if date_columns:
-            response += f"\nDate Column Analysis:\n"
-            for col in date_columns[:2]:  # Show first 2 date columns
-                response += f"  • SELECT MIN({col}), MAX({col}) FROM {table_name};\n"
+            parts.append("\nDate Column Analysis:\n")
+            for col in date_columns:  # At most 2 date columns
+                parts.append(f"  • SELECT MIN({col}), MAX({col}) FROM {table_name};\n")
         
         # Foreign key joins
         if schema.foreign_keys:
-            response += f"\nJoin Queries:\n"
+            parts.append("\nJoin Queries:\n")
             for fk in schema.foreign_keys[:2]:  # Show first 2 foreign keys
-                response += f"  • SELECT * FROM {table_name} t1 JOIN {fk.referred_table} t2 ON t1.{fk.constrained_columns[0]} = t2.{fk.referred_columns[0]} LIMIT 10;\n"
+                parts.append(f"  • SELECT * FROM {table_name} t1 JOIN {fk.referred_table} t2 ON t1.{fk.constrained_columns[0]} = t2.{fk.referred_columns[0]} LIMIT 10;\n")
         
-        return response
+        return "".join(parts)
         
     except Exception as e:
-        print(f"ERROR in suggest_useful_queries: {e}")
+        log.exception("ERROR in suggest_useful_queries: %s", e)
         return f"Error suggesting queries for table '{table_name}': {str(e)}"
 
 
-@mcp.tool()
+@threaded_tool()
 def get_transcript(url: str) -> str:
     """
     Fetch the complete transcript of a YouTube video.
@@ -705,53 +921,27 @@ def get_transcript(url: str) -> str:
     exactly as provided by the YouTube transcript API.
     """
     try:
-        # Extract video ID
-        video_id = None
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'(?:embed\/)([0-9A-Za-z_-]{11})',
-            r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                video_id = match.group(1)
-                break
+        # Extract video ID (the pattern already enforces the 11-character ID format)
+        match = _YT_ID_RE.search(url)
+        video_id = match.group(1) if match else None
         
         if not video_id:
             raise ValueError("Invalid YouTube URL")
         
-        # Validate video ID
-        YouTubeVideo(video_id=video_id, url=url)
-        
         # Fetch transcript
-        transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
+        transcript_list = _get_yt_api().get_transcript(video_id)
         # Keep transcript exactly as received, just extract the text content
-        transcript_text = " ".join([item["text"] for item in transcript_list])
-        word_count = len(transcript_text.split())
-        
-        response = TranscriptResponse(
-            success=True,
-            video_id=video_id,
-            url=url,
-            transcript=transcript_text,
-            word_count=word_count
-        )
+        transcript_text = " ".join(map(itemgetter("text"), transcript_list))
+        word_count = sum(1 for _ in _WORD_RE.finditer(transcript_text))
         
-        print(f"DEBUG: Fetched transcript for video ID: {video_id}, word count: {word_count}")
-        return response.get_formatted_response()
+        log.debug("Fetched transcript for video ID: %s, word count: %d", video_id, word_count)
+        return _format_transcript(url, video_id, transcript_text, word_count)
     
     except Exception as e:
-        print(f"ERROR in get_transcript: {e}")
-        response = TranscriptResponse(
-            success=False,
-            video_id=video_id or "unknown",
-            url=url,
-            error=str(e)
-        )
-        return response.get_formatted_response()
+        log.exception("ERROR in get_transcript: %s", e)
+        return _format_transcript(url, video_id or "unknown", None, None, error=str(e))
 
-@mcp.tool()
+@threaded_tool()
 def visit_webpage(url: str) -> str:
     """
     Visits a webpage at the given URL and returns its content as a Markdown string.
@@ -768,45 +958,88 @@ def visit_webpage(url: str) -> str:
         A string containing the Markdown representation of the webpage
         content, or an error message if the webpage cannot be accessed.
     """
+    from requests.exceptions import RequestException
+    
     try:
-        # Send a GET request to the URL
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
+        # Revalidate a cached copy with a conditional GET
+        cache = _webpage_cache()
+        cached = cache.get(url)
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        # Send a GET request to the URL, streaming the body so oversized pages are cut off early
+        with _http_session().get(url, headers=headers, timeout=WEBPAGE_TIMEOUT, stream=True) as response:
+            if cached and response.status_code == 304:
+                log.debug("Webpage not modified, using cached content for URL: %s", url)
+                return _format_webpage(url, cached["markdown"])
+            
+            response.raise_for_status()  # Raise an exception for bad status codes
+            
+            if int(response.headers.get("Content-Length") or 0) > WEBPAGE_MAX_BYTES:
+                raise ValueError(f"Webpage is larger than {WEBPAGE_MAX_BYTES >> 20} MB")
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if len(body) > WEBPAGE_MAX_BYTES:
+                    raise ValueError(f"Webpage is larger than {WEBPAGE_MAX_BYTES >> 20} MB")
+            # response.apparent_encoding would re-read the already consumed body, so detect from the bytes
+            html = body.decode(response.encoding or _detect_encoding(body), errors="replace")
 
         # Convert the HTML content to Markdown
-        markdown_content = markdownify(response.text).strip()
+        markdown_content = html_to_markdown(html)
 
         # Remove multiple line breaks
-        markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
-
-        response_obj = WebpageResponse(
-            success=True,
-            url=url,
-            content=markdown_content
-        )
+        markdown_content = _MULTI_NL_RE.sub("\n\n", markdown_content)
         
-        print(f"DEBUG: Successfully fetched content for URL: {url}")
-        return response_obj.get_formatted_response()
+        # Only pages with validators can be revalidated later
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache[url] = {"etag": etag, "last_modified": last_modified, "markdown": markdown_content}
+
+        log.debug("Successfully fetched content for URL: %s", url)
+        return _format_webpage(url, markdown_content)
     
     except RequestException as e:
-        print(f"ERROR in visit_webpage: {e}")
-        response_obj = WebpageResponse(
-            success=False,
-            url=url,
-            error=str(e)
-        )
-        return response_obj.get_formatted_response()
+        log.error("ERROR in visit_webpage: %s", e)
+        return _format_webpage(url, None, error=str(e))
     
     except Exception as e:
-        print(f"ERROR in visit_webpage: Unexpected error: {e}")
-        response_obj = WebpageResponse(
-            success=False,
-            url=url,
-            error=f"An unexpected error occurred: {str(e)}"
-        )
-        return response_obj.get_formatted_response()
+        log.exception("ERROR in visit_webpage: Unexpected error: %s", e)
+        return _format_webpage(url, None, error=f"An unexpected error occurred: {str(e)}")
+
+@threaded_tool()
+def visit_webpages(urls: List[str]) -> str:
+    """
+    Visits several webpages at once and returns their content as Markdown.
+
+    This tool is the multi-URL variant of visit_webpage. The pages are
+    fetched concurrently, so the total time is close to that of the
+    slowest page rather than the sum of all of them.
+
+    Args:
+        urls: The URLs of the webpages to visit.
+
+    Returns:
+        The formatted content of each webpage in the order given, separated
+        by blank lines, with an error message in place of any page that
+        cannot be accessed.
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    if not unique_urls:
+        return "No URLs given"
+    
+    with ThreadPoolExecutor(max_workers=min(WEBPAGE_MAX_CONCURRENT, len(unique_urls))) as pool:
+        pages = dict(zip(unique_urls, pool.map(visit_webpage, unique_urls)))
+    
+    log.debug("Fetched %d webpages in one call", len(unique_urls))
+    return "\n\n".join(pages[url] for url in urls)
 
-@mcp.tool()
+@threaded_tool()
 def find_similar_column_names(table_name: str, search_term: str) -> str:
     """
     Finds column names in a table that are similar to a given search term.
@@ -825,56 +1058,159 @@ def find_similar_column_names(table_name: str, search_term: str) -> str:
         a message if no similar columns are found.
     """
     try:
-        schema = db_manager.get_table_schema(table_name)
+        schema = _cached_schema(table_name)
         
         if not schema.columns:
             return f"Table '{table_name}' not found or has no columns"
         
-        # Get all column names
-        column_names = [col.name.lower() for col in schema.columns]
+        # Get all column names; lowercased once per cached schema
+        column_names = schema.column_names_lower
         search_lower = search_term.lower()
         
-        # Find exact matches
-        exact_matches = [name for name in column_names if name == search_lower]
-        
-        # Find partial matches
-        partial_matches = [name for name in column_names if search_lower in name or name in search_lower]
-        
-        # Find similar matches (contains similar words)
-        similar_words = ['name', 'category', 'title', 'label', 'type', 'kind', 'class']
+        # Sort columns into exact and partial matches in a single pass;
+        # prefix hits are checked first and ranked ahead of other partial matches
+        search_len = len(search_lower)
+        exact_matches = []
+        prefix_matches = []
+        other_matches = []
+        for name in column_names:
+            if name == search_lower:
+                exact_matches.append(name)
+                prefix_matches.append(name)
+            elif name.startswith(search_lower):
+                prefix_matches.append(name)
+            elif search_lower in name or (len(name) < search_len and name in search_lower):
+                other_matches.append(name)
+        partial_matches = prefix_matches + other_matches
+        
+        # Rank the remaining columns by edit similarity only when the cheap checks found nothing
         similar_matches = []
-        for word in similar_words:
-            if word in search_lower:
-                similar_matches.extend([name for name in column_names if word in name])
+        if not exact_matches and not partial_matches:
+            similar_matches = _fuzzy_matches(search_lower, column_names)
         
-        # Remove duplicates and organize results
-        all_matches = list(set(exact_matches + partial_matches + similar_matches))
-        
-        response = f"Column name suggestions for '{search_term}' in table '{table_name}':\n\n"
+        parts = [f"Column name suggestions for '{search_term}' in table '{table_name}':\n\n"]
         
         if exact_matches:
-            response += f"✅ Exact matches: {exact_matches}\n"
+            parts.append(f"✅ Exact matches: {exact_matches}\n")
         
         if partial_matches and not exact_matches:
-            response += f"🔍 Partial matches: {partial_matches}\n"
+            parts.append(f"🔍 Partial matches: {partial_matches}\n")
         
         if similar_matches and not exact_matches and not partial_matches:
-            response += f"💡 Similar matches: {list(set(similar_matches))}\n"
+            parts.append(f"💡 Similar matches: {similar_matches}\n")
         
-        if not all_matches:
-            response += "❌ No similar column names found.\n"
+        if not (exact_matches or partial_matches or similar_matches):
+            parts.append("❌ No similar column names found.\n")
         
         # Always show all available columns
-        response += f"\n📋 All available columns in '{table_name}':\n"
+        parts.append(f"\n📋 All available columns in '{table_name}':\n")
         for col in schema.columns:
-            response += f"  • {col.name} ({col.type})\n"
+            parts.append(f"  • {col.name} ({col.type})\n")
         
-        return response
+        return "".join(parts)
         
     except Exception as e:
-        print(f"ERROR in find_similar_column_names: {e}")
+        log.exception("ERROR in find_similar_column_names: %s", e)
         return f"Error searching for similar column names: {str(e)}"
 
+@threaded_tool()
+def get_table_schemas(table_names: List[str]) -> str:
+    """
+    Get schema information for several tables in a single call.
+
+    This tool is the multi-table variant of get_table_schema. It avoids a
+    separate tool round-trip per table when the schemas of several tables
+    are needed at once, e.g. before writing a join query.
+
+    Args:
+        table_names: The names of the tables to retrieve the schemas for.
+
+    Returns:
+        The formatted schemas of all requested tables, separated by blank lines.
+    """
+    return "\n\n".join(get_table_schema(table_name) for table_name in table_names)
+
+
+def _to_json(obj) -> str:
+    """Serialize a tool payload to JSON, with orjson when it is installed"""
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+# Seconds a batched call may run when the caller gives no timeout of its own
+BATCH_CALL_TIMEOUT = float(os.getenv("BATCH_CALL_TIMEOUT", "60"))
+
+# Tools that may be dispatched through batch_execute
+BATCHABLE_TOOLS = {
+    "list_tables": list_tables,
+    "get_table_schema": get_table_schema,
+    "get_table_schemas": get_table_schemas,
+    "execute_select_query": execute_select_query,
+    "get_sample_data": get_sample_data,
+    "get_database_overview": get_database_overview,
+    "analyze_table_relationships": analyze_table_relationships,
+    "get_table_statistics": get_table_statistics,
+    "suggest_useful_queries": suggest_useful_queries,
+    "get_transcript": get_transcript,
+    "visit_webpage": visit_webpage,
+    "visit_webpages": visit_webpages,
+    "find_similar_column_names": find_similar_column_names,
+}
+
+
+@threaded_tool()
+def batch_execute(calls: List[dict], max_concurrent: int = 8) -> str:
+    """
+    Execute several independent tool calls in one request.
+
+    Each call is run concurrently on the server and the results are
+    returned in the same order as the calls. This saves one client-server
+    round-trip per call when the calls do not depend on each other.
+
+    Args:
+        calls: List of {"tool": <tool name>, "arguments": {<keyword arguments>}, "timeout": <seconds>}
+            objects; "timeout" is optional and counts from the start of the batch.
+        max_concurrent: Maximum number of calls executed at the same time (default is 8).
+
+    Returns:
+        A JSON array with the formatted result of each call, in call order.
+    """
+    def run_call(call: dict) -> str:
+        tool_name = call.get("tool")
+        tool_fn = BATCHABLE_TOOLS.get(tool_name)
+        if tool_fn is None:
+            return f"Error: Unknown tool '{tool_name}'"
+        try:
+            return tool_fn(**call.get("arguments", {}))
+        except Exception as e:
+            log.exception("ERROR in batch_execute (%s): %s", tool_name, e)
+            return f"Error in {tool_name}: {str(e)}"
+    
+    if not calls:
+        return _to_json([])
+    
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_concurrent, len(calls))))
+    try:
+        start = time.monotonic()
+        futures = [pool.submit(run_call, call) for call in calls]
+        
+        results = []
+        for call, future in zip(calls, futures):
+            timeout = float(call.get("timeout") or BATCH_CALL_TIMEOUT)
+            try:
+                results.append(future.result(timeout=max(0, start + timeout - time.monotonic())))
+            except FuturesTimeoutError:
+                future.cancel()
+                log.error("ERROR in batch_execute (%s): timed out after %gs", call.get("tool"), timeout)
+                results.append(
+                    f"Error: {call.get('tool')} timed out after {timeout:g}s. "
+                    "Some tools timed out; you may retry them or proceed with the other results."
+                )
+    finally:
+        # Don't wait for calls that timed out; their threads finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    log.debug("Executed batch of %d tool calls", len(calls))
+    return _to_json(results)
+
 if __name__ == "__main__":
     print("🚀 Starting Enhanced MCP Server ...... !")
     mcp.run(transport="streamable-http")
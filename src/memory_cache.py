@@ -0,0 +1,54 @@
+"""
+In-memory LRU cache used in place of diskcache.Cache when diskcache is not installed.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe LRU cache with the get / set(expire=...) interface of diskcache.Cache.
+
+    Holds at most maxsize entries, evicting the least recently used one first.
+    Entries set with an expiry are dropped when read after it has passed.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expiry on the monotonic clock or None, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the value for key, or default when it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expire: float = None) -> bool:
+        """Store value under key, for expire seconds when given"""
+        expires_at = time.monotonic() + expire if expire is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
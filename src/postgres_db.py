@@ -6,16 +6,50 @@ and provides database introspection capabilities for the Text-to-SQL agent.
 """
 
 import os
+import time
+import logging
+import threading
+from functools import cached_property
+from itertools import islice
 from typing import List, Dict, Any, Optional, Union, Tuple
 from sqlalchemy import create_engine, MetaData, inspect, text
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field, field_validator, ConfigDict, ValidationInfo
+from pydantic import BaseModel, Field, field_validator, ConfigDict, ValidationInfo, TypeAdapter
 from enum import Enum
 
 # Load environment variables
 load_dotenv()
 
+# Errors and connection events go through logging; the host application decides where they end up
+log = logging.getLogger("agentarium.postgres")
+
+# Planner row estimate; a bound parameter keeps the statement text constant so it is compiled once
+ROW_ESTIMATE_SQL = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name AND pg_table_is_visible(oid)"
+)
+
+# Changes whenever a table, column, index or constraint in the current schema is added,
+# altered or dropped: DDL rewrites the affected pg_class / pg_constraint rows (new xmin)
+SCHEMA_VERSION_SQL = text("""
+    SELECT (SELECT count(*) || ':' || coalesce(sum(xmin::text::bigint), 0)
+            FROM pg_class WHERE relnamespace = to_regnamespace(current_schema()))
+        || '/' ||
+           (SELECT count(*) || ':' || coalesce(sum(xmin::text::bigint), 0)
+            FROM pg_constraint WHERE connamespace = to_regnamespace(current_schema()))
+""")
+# Seconds between schema version checks; reflection results are reused in between
+SCHEMA_VERSION_CHECK_INTERVAL = float(os.getenv('SCHEMA_VERSION_CHECK_INTERVAL', '5'))
+# Most per-table statements kept; table names come from the agent, so the cache must not grow without bound
+TABLE_STATEMENT_CACHE_SIZE = 256
+
+# Per-table statements; the table name is quoted into {table}, values are bound parameters
+COUNT_SQL = "SELECT COUNT(*) FROM {table}"
+SAMPLE_SQL = "SELECT * FROM {table} LIMIT :limit"
+
+# Rows fetched per round-trip when execute_query streams a result
+QUERY_CHUNK_SIZE = 1000
+
 class ColumnType(str, Enum):
     """Common SQL column types"""
     INTEGER = "INTEGER"
@@ -31,7 +65,7 @@ class ColumnType(str, Enum):
 
 class DatabaseColumn(BaseModel):
     """Represents a database column with all its properties"""
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True, extra='ignore')
     
     name: str = Field(..., description="Column name")
     type: str = Field(..., description="Column data type")
@@ -52,6 +86,8 @@ class DatabaseColumn(BaseModel):
 
 class ForeignKey(BaseModel):
     """Represents a foreign key constraint"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+    
     constrained_columns: List[str] = Field(..., description="Columns that are constrained")
     referred_table: str = Field(..., description="Referenced table name")
     referred_columns: List[str] = Field(..., description="Referenced columns")
@@ -59,10 +95,17 @@ class ForeignKey(BaseModel):
 
 class TableIndex(BaseModel):
     """Represents a database index"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+    
     name: str = Field(..., description="Index name")
     columns: List[str] = Field(..., description="Indexed columns")
     unique: bool = Field(default=False, description="Whether index is unique")
 
+# Reflected columns, foreign keys and indexes are validated a whole list per call
+_COLUMN_LIST_ADAPTER = TypeAdapter(List[DatabaseColumn])
+_FOREIGN_KEY_LIST_ADAPTER = TypeAdapter(List[ForeignKey])
+_INDEX_LIST_ADAPTER = TypeAdapter(List[TableIndex])
+
 class TableSchema(BaseModel):
     """Complete schema information for a database table"""
     table_name: str = Field(..., description="Name of the table")
@@ -71,6 +114,12 @@ class TableSchema(BaseModel):
     foreign_keys: List[ForeignKey] = Field(default_factory=list, description="Foreign key constraints")
     indexes: List[TableIndex] = Field(default_factory=list, description="Table indexes")
     row_count: Optional[int] = Field(None, description="Approximate number of rows")
+    row_count_exact: bool = Field(default=False, description="Whether row_count is an exact COUNT(*)")
+    
+    @cached_property
+    def column_names_lower(self) -> Tuple[str, ...]:
+        """Lowercased column names, computed once per schema"""
+        return tuple(col.name.lower() for col in self.columns)
     
     @field_validator('table_name')
     @classmethod
@@ -101,6 +150,7 @@ class QueryResult(BaseModel):
     rows_affected: Optional[int] = Field(None, description="Number of rows affected")
     execution_time: Optional[float] = Field(None, description="Query execution time in seconds")
     columns: Optional[List[str]] = Field(None, description="Column names in result")
+    row_count: Optional[int] = Field(None, description="Number of rows returned, including rows not kept in data")
     
     @field_validator('data')
     @classmethod
@@ -122,17 +172,16 @@ class SampleData(BaseModel):
         if not self.rows:
             return f"No sample data available for table '{self.table_name}'"
         
-        preview = f"Sample data from '{self.table_name}' ({len(self.rows)} rows):\n"
-        for i, row in enumerate(self.rows[:max_rows]):
-            row_preview = ", ".join([f"{k}: {v}" for k, v in list(row.items())[:5]])
-            if len(row) > 5:
-                row_preview += "..."
-            preview += f"  {i+1}. {row_preview}\n"
+        parts = [f"Sample data from '{self.table_name}' ({len(self.rows)} rows):\n"]
+        for i, row in enumerate(islice(self.rows, max_rows), 1):
+            row_preview = ", ".join(f"{k}: {v}" for k, v in islice(row.items(), 5))
+            ellipsis = "..." if len(row) > 5 else ""
+            parts.append(f"  {i}. {row_preview}{ellipsis}\n")
         
         if len(self.rows) > max_rows:
-            preview += f"  ... and {len(self.rows) - max_rows} more rows"
+            parts.append(f"  ... and {len(self.rows) - max_rows} more rows")
         
-        return preview
+        return "".join(parts)
 
 class ConnectionConfig(BaseModel):
     """Database connection configuration"""
@@ -168,6 +217,13 @@ class PostgreSQLManager:
         self.config = self._load_config(database_name)
         self.engine = None
         self.metadata_obj = MetaData()
+        self._table_statements = {}  # (template, table name) -> statement
+        self._inspector = None
+        self._schema_version = None
+        self._version_checked_at = float('-inf')
+        self._schema_cache = {}  # (table name, schema version) -> TableSchema
+        self._cache_lock = threading.Lock()  # tools run on worker threads and share the caches
+        self._admin_engine = None  # engine for the 'postgres' maintenance database, created on first use
         self._connect()
     
     def _load_config(self, database_name: Optional[str] = None) -> ConnectionConfig:
@@ -189,26 +245,45 @@ class PostgreSQLManager:
                 echo=False,
                 pool_pre_ping=True,
                 pool_recycle=3600,
+                # Tools run concurrently in worker threads, each holding a pooled connection
+                pool_size=int(os.getenv('POSTGRES_POOL_SIZE', '10')),
+                max_overflow=int(os.getenv('POSTGRES_MAX_OVERFLOW', '10')),
             )
             
             # Test the connection
             with self.engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
             
-            print(f"✅ Connected to 🐘 PostgreSQL database '{self.config.database}' successfully")
+            # Shared inspector: it memoizes reflection queries until the schema version changes
+            self._inspector = inspect(self.engine)
+            
+            log.info("✅ Connected to 🐘 PostgreSQL database '%s' successfully", self.config.database)
             
         except Exception as e:
-            print(f"❌ Failed to connect to PostgreSQL: {e}")
+            log.error("❌ Failed to connect to PostgreSQL: %s", e)
             raise
     
+    def _get_admin_engine(self):
+        """Engine for the 'postgres' maintenance database, kept for reuse across calls."""
+        if self.config.database == "postgres":
+            return self.engine
+        if self._admin_engine is None:
+            temp_config = self.config.model_copy()
+            temp_config.database = "postgres"
+            # Rarely used, so a single pooled connection is enough
+            self._admin_engine = create_engine(
+                temp_config.get_connection_string(),
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                pool_size=1,
+                max_overflow=0,
+            )
+        return self._admin_engine
+    
     def list_databases(self) -> List[str]:
         """List all available databases on the PostgreSQL server."""
         try:
-            temp_config = self.config.model_copy()
-            temp_config.database = "postgres"
-            temp_engine = create_engine(temp_config.get_connection_string())
-            
-            with temp_engine.connect() as conn:
+            with self._get_admin_engine().connect() as conn:
                 result = conn.execute(text("""
                     SELECT datname FROM pg_database 
                     WHERE datistemplate = false 
@@ -219,85 +294,214 @@ class PostgreSQLManager:
             return databases
             
         except Exception as e:
-            print(f"Error listing databases: {e}")
+            log.error("Error listing databases: %s", e)
             return []
     
+    def _get_inspector(self):
+        """Get the shared inspector, dropping cached reflection results if the schema changed."""
+        now = time.monotonic()
+        if now - self._version_checked_at >= SCHEMA_VERSION_CHECK_INTERVAL:
+            self._version_checked_at = now
+            with self.engine.connect() as conn:
+                version = conn.execute(SCHEMA_VERSION_SQL).scalar()
+            if version != self._schema_version:
+                with self._cache_lock:
+                    self._schema_version = version
+                    self._inspector.info_cache.clear()
+                    self._schema_cache.clear()
+        return self._inspector
+    
+    def current_schema_version(self):
+        """Return the schema version, re-reading it at most every SCHEMA_VERSION_CHECK_INTERVAL seconds."""
+        self._get_inspector()
+        return self._schema_version
+    
+    def invalidate_schema_cache(self, table_name: Optional[str] = None):
+        """Drop cached reflection results, for one table or all of them, after DDL run outside the schema version check."""
+        # Other tool threads add entries meanwhile, so scan snapshots of the keys under the lock
+        with self._cache_lock:
+            if table_name is None:
+                self._schema_cache.clear()
+                self._table_statements.clear()
+            else:
+                for key in list(self._schema_cache):
+                    if key[0] == table_name:
+                        self._schema_cache.pop(key, None)
+                for key in list(self._table_statements):
+                    if key[1] == table_name:
+                        self._table_statements.pop(key, None)
+        if self._inspector is not None:
+            self._inspector.info_cache.clear()
+        # Re-read the schema version on the next lookup
+        self._version_checked_at = float('-inf')
+    
     def list_tables(self) -> List[str]:
         """List all tables in the current database."""
         try:
-            inspector = inspect(self.engine)
+            inspector = self._get_inspector()
             tables = inspector.get_table_names()
             return tables
         except Exception as e:
-            print(f"Error listing tables: {e}")
+            log.error("Error listing tables: %s", e)
             return []
     
     def get_table_schema(self, table_name: str) -> TableSchema:
         """Get detailed schema information for a specific table."""
         try:
-            inspector = inspect(self.engine)
-            
-            # Get columns
-            columns_info = inspector.get_columns(table_name)
-            columns = []
-            
-            for col_info in columns_info:
-                column = DatabaseColumn(
-                    name=col_info['name'],
-                    type=str(col_info['type']),
-                    nullable=col_info['nullable'],
-                    default=str(col_info['default']) if col_info['default'] is not None else None
-                )
-                columns.append(column)
-            
-            # Get primary keys
-            pk_constraint = inspector.get_pk_constraint(table_name)
-            primary_keys = pk_constraint.get('constrained_columns', [])
-            
-            # Update primary key info in columns
-            for col in columns:
-                if col.name in primary_keys:
-                    col.primary_key = True
-            
-            # Get foreign keys
-            fk_info = inspector.get_foreign_keys(table_name)
-            foreign_keys = []
-            for fk in fk_info:
-                foreign_key = ForeignKey(
-                    constrained_columns=fk['constrained_columns'],
-                    referred_table=fk['referred_table'],
-                    referred_columns=fk['referred_columns'],
-                    name=fk.get('name')
-                )
-                foreign_keys.append(foreign_key)
-            
-            # Get indexes
-            indexes_info = inspector.get_indexes(table_name)
-            indexes = []
-            for idx in indexes_info:
-                index = TableIndex(
-                    name=idx['name'],
-                    columns=idx['column_names'],
-                    unique=idx['unique']
-                )
-                indexes.append(index)
-            
-            return TableSchema(
-                table_name=table_name,
-                columns=columns,
-                primary_keys=primary_keys,
-                foreign_keys=foreign_keys,
-                indexes=indexes
-            )
+            inspector = self._get_inspector()
+            key = (table_name, self._schema_version)
+            table_schema = self._schema_cache.get(key)
+            if table_schema is None:
+                table_schema = self._read_table_schema(inspector, table_name)
+                if table_schema.columns:
+                    with self._cache_lock:
+                        self._schema_cache[key] = table_schema
+            return table_schema
             
         except Exception as e:
-            print(f"Error getting schema for table {table_name}: {e}")
+            log.error("Error getting schema for table %s: %s", table_name, e)
             return TableSchema(table_name=table_name)
     
+    def _read_table_schema(self, inspector, table_name: str) -> TableSchema:
+        """Build a TableSchema from an inspector bound to an engine or a connection."""
+        return self._build_table_schema(
+            table_name,
+            inspector.get_columns(table_name),
+            inspector.get_pk_constraint(table_name),
+            inspector.get_foreign_keys(table_name),
+            inspector.get_indexes(table_name),
+        )
+    
+    def _type_name(self, column_type) -> str:
+        """Type name of a reflected column, compiled with the engine's dialect."""
+        # str() on a type builds a fresh default dialect on every call
+        try:
+            return column_type.compile(dialect=self.engine.dialect)
+        except Exception:
+            # Types the dialect cannot render in DDL, such as NullType for unknown columns
+            return str(column_type)
+    
+    def _build_table_schema(self, table_name: str, columns_info: List[Dict[str, Any]], pk_constraint: Dict[str, Any],
+                            fk_info: List[Dict[str, Any]], indexes_info: List[Dict[str, Any]]) -> TableSchema:
+        """Build a TableSchema from raw reflection results."""
+        # Get primary keys
+        primary_keys = pk_constraint.get('constrained_columns', [])
+        
+        # Get columns; the models are frozen, so primary key info is set up front
+        columns = _COLUMN_LIST_ADAPTER.validate_python([
+            {
+                'name': col_info['name'],
+                'type': self._type_name(col_info['type']),
+                'nullable': col_info['nullable'],
+                'default': str(col_info['default']) if col_info['default'] is not None else None,
+                'primary_key': col_info['name'] in primary_keys,
+            }
+            for col_info in columns_info
+        ])
+        
+        # Get foreign keys
+        foreign_keys = _FOREIGN_KEY_LIST_ADAPTER.validate_python([
+            {
+                'constrained_columns': fk['constrained_columns'],
+                'referred_table': fk['referred_table'],
+                'referred_columns': fk['referred_columns'],
+                'name': fk.get('name'),
+            }
+            for fk in fk_info
+        ])
+        
+        # Get indexes
+        indexes = _INDEX_LIST_ADAPTER.validate_python([
+            {
+                'name': idx['name'],
+                'columns': idx['column_names'],
+                'unique': idx['unique'],
+            }
+            for idx in indexes_info
+        ])
+        
+        return TableSchema(
+            table_name=table_name,
+            columns=columns,
+            primary_keys=primary_keys,
+            foreign_keys=foreign_keys,
+            indexes=indexes
+        )
+    
+    def _table_statement(self, template: str, table_name: str):
+        """Statement for a table, built once from a template with the table name as a quoted identifier."""
+        key = (template, table_name)
+        with self._cache_lock:
+            statement = self._table_statements.get(key)
+            if statement is None:
+                preparer = self.engine.dialect.identifier_preparer
+                quoted = ".".join(preparer.quote(part) for part in table_name.split("."))
+                statement = text(template.format(table=quoted))
+                if len(self._table_statements) >= TABLE_STATEMENT_CACHE_SIZE:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    del self._table_statements[next(iter(self._table_statements))]
+                self._table_statements[key] = statement
+        return statement
+    
+    def _row_count(self, conn, table_name: str) -> Tuple[Optional[int], bool]:
+        """Row count of a table as (count, exact).
+        
+        Uses the planner estimate in pg_class, which avoids a full table scan, and
+        only falls back to an exact COUNT(*) when the table has no statistics yet.
+        """
+        estimate = conn.execute(ROW_ESTIMATE_SQL, {"table_name": table_name}).scalar()
+        if estimate is not None and estimate > 0:
+            return estimate, False
+        
+        return conn.execute(self._table_statement(COUNT_SQL, table_name)).scalar(), True
+    
+    def get_table_statistics_bundle(self, table_name: str, table_schema: Optional[TableSchema] = None) -> TableSchema:
+        """Get a table's schema together with its row count over a single connection.
+        
+        Pass an already known table_schema to only fetch the row count.
+        """
+        try:
+            with self.engine.connect() as conn:
+                if table_schema is None:
+                    table_schema = self._read_table_schema(inspect(conn), table_name)
+                else:
+                    table_schema = table_schema.model_copy()
+                
+                if table_schema.columns:
+                    table_schema.row_count, table_schema.row_count_exact = self._row_count(conn, table_name)
+                return table_schema
+                
+        except Exception as e:
+            log.error("Error getting statistics for table %s: %s", table_name, e)
+            return table_schema or TableSchema(table_name=table_name)
+    
     def get_database_schema(self) -> DatabaseSchema:
         """Get comprehensive schema information for the entire database."""
         schema = DatabaseSchema(database_name=self.config.database)
         
+        try:
+            # One catalog query per kind of object for all tables, instead of four per table
+            inspector = self._get_inspector()
+            columns = inspector.get_multi_columns()
+            pk_constraints = inspector.get_multi_pk_constraint()
+            foreign_keys = inspector.get_multi_foreign_keys()
+            indexes = inspector.get_multi_indexes()
+            reflected = {
+                key[1]: (columns[key], pk_constraints.get(key, {}), foreign_keys.get(key, []), indexes.get(key, []))
+                for key in columns
+            }
+            
+            for table in sorted(reflected):
+                schema.tables[table] = self._build_table_schema(table, *reflected[table])
+            with self._cache_lock:
+                for table, table_schema in schema.tables.items():
+                    self._schema_cache[(table, self._schema_version)] = table_schema
+            
+            schema.total_tables = len(schema.tables)
+            return schema
+        except Exception as e:
+            log.warning("Error reading schema in bulk, reflecting table by table: %s", e)
+        
         tables = self.list_tables()
         for table in tables:
             table_schema = self.get_table_schema(table)
@@ -306,26 +510,43 @@ class PostgreSQLManager:
         schema.total_tables = len(tables)
         return schema
     
-    def execute_query(self, query: str) -> QueryResult:
-        """Execute a SQL query and return structured results."""
-        import time
+    def execute_query(self, query: str, stream: bool = False, max_rows: Optional[int] = None) -> QueryResult:
+        """Execute a SQL query and return structured results.
+        
+        With stream=True, rows are read through a server-side cursor QUERY_CHUNK_SIZE rows at a
+        time and only the first max_rows are kept in data, so memory use stays bounded however
+        many rows the query returns; row_count still counts all of them.
+        """
         start_time = time.time()
         
         try:
             with self.engine.connect() as conn:
+                if stream:
+                    conn = conn.execution_options(stream_results=True, max_row_buffer=QUERY_CHUNK_SIZE)
                 result = conn.execute(text(query))
                 execution_time = time.time() - start_time
                 
                 if result.returns_rows:
-                    rows = result.fetchall()
+                    # Building dicts straight off the cursor skips the intermediate list of Row objects;
+                    # result.mappings() measured about twice as slow once converted to dicts
                     columns = list(result.keys())
-                    data = [dict(zip(columns, row)) for row in rows]
+                    if stream:
+                        data = []
+                        row_count = 0
+                        for partition in result.partitions(QUERY_CHUNK_SIZE):
+                            row_count += len(partition)
+                            keep = len(partition) if max_rows is None else max_rows - len(data)
+                            data.extend(dict(zip(columns, row)) for row in partition[:keep])
+                    else:
+                        data = [dict(zip(columns, row)) for row in result]
+                        row_count = len(data)
                     
                     return QueryResult(
                         success=True,
                         data=data,
                         columns=columns,
-                        execution_time=execution_time
+                        execution_time=execution_time,
+                        row_count=row_count
                     )
                 else:
                     return QueryResult(
@@ -350,21 +571,25 @@ class PostgreSQLManager:
     def get_sample_data(self, table_name: str, limit: int = 5) -> SampleData:
         """Get sample data from a table."""
         try:
-            query = f"SELECT * FROM {table_name} LIMIT {limit}"
-            result = self.execute_query(query)
+            statement = self._table_statement(SAMPLE_SQL, table_name)
+            with self.engine.connect() as conn:
+                # Stream so only the requested rows are fetched from the server cursor
+                result = conn.execution_options(stream_results=True).execute(statement, {"limit": limit})
+                columns = list(result.keys())
+                rows = [dict(zip(columns, row)) for row in result.fetchmany(limit)]
             
-            if result.success and result.data:
+            if rows:
                 return SampleData(
                     table_name=table_name,
-                    rows=result.data,
-                    total_rows_sampled=len(result.data),
-                    columns=result.columns or []
+                    rows=rows,
+                    total_rows_sampled=len(rows),
+                    columns=columns
                 )
             else:
                 return SampleData(table_name=table_name)
                 
         except Exception as e:
-            print(f"Error getting sample data from {table_name}: {e}")
+            log.error("Error getting sample data from %s: %s", table_name, e)
             return SampleData(table_name=table_name)
     
     def generate_table_description(self, table_name: str) -> str:
@@ -393,10 +618,12 @@ class PostgreSQLManager:
     
     def close(self):
         """Close database connection."""
+        if self._admin_engine:
+            self._admin_engine.dispose()
+            self._admin_engine = None
         if self.engine:
             self.engine.dispose()
-            print()
-            print("Database connection closed.")
+            log.info("Database connection closed.")
 
 
 def main():
@@ -437,4 +664,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Tests for the agent's parallel tool executor.
+
+src/Agent.py is loaded with a placeholder Gemini key and without an MCP server,
+so it starts in basic mode.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def load_agent_module():
+    """Load src/Agent.py with the MCP connection failing, as when the server is down"""
+    import smolagents
+    spec = importlib.util.spec_from_file_location("agent_module", os.path.join(SRC, "Agent.py"))
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(os.environ, {"GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "test-key")}), \
+            mock.patch.object(smolagents, "MCPClient", side_effect=ConnectionError("no MCP server")):
+        spec.loader.exec_module(module)
+    return module
+
+agent_module = load_agent_module()
+
+class ParallelToolExecutorTests(unittest.TestCase):
+    def setUp(self):
+        self.executor = agent_module.ParallelToolExecutor(max_workers=4)
+        self.release = threading.Event()
+        self.executor.tools = {
+            "echo": lambda value: value,
+            "fail": lambda: 1 / 0,
+            "hang": lambda: self.release.wait(5) and "released",
+        }
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown()
+
+    def test_results_keep_call_order(self):
+        calls = [("echo", {"value": i}) for i in range(8)]
+        self.assertEqual(self.executor.execute(calls), list(range(8)))
+
+    def test_errors_are_reported_per_call(self):
+        results = self.executor.execute([("echo", {"value": 1}), ("fail", {}), ("missing", {})])
+        self.assertEqual(results[0], 1)
+        self.assertTrue(results[1].startswith("Error in fail:"))
+        self.assertEqual(results[2], "Error in missing: Unknown tool 'missing'")
+
+    def test_slow_call_times_out(self):
+        with mock.patch.dict(agent_module.TOOL_TIMEOUTS, {"hang": 0.2}):
+            start = time.monotonic()
+            results = self.executor.execute([("echo", {"value": 1}), ("hang", {})])
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(results[0], 1)
+        self.assertTrue(results[1].startswith("Error: hang timed out after 0.2s"))
+
+    def test_stop_on_error_skips_running_calls(self):
+        with mock.patch.dict(agent_module.TOOL_TIMEOUTS, {"hang": 3}):
+            start = time.monotonic()
+            results = self.executor.execute([("fail", {}), ("hang", {})], stop_on_error=True)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(results[0].startswith("Error in fail:"))
+        self.assertEqual(results[1], "Error: hang was skipped because another tool call failed")
+
+    def test_sequential_without_pool(self):
+        executor = agent_module.ParallelToolExecutor(max_workers=1)
+        executor.tools = self.executor.tools
+        self.assertEqual(executor.execute([("echo", {"value": "a"}), ("fail", {})])[0], "a")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Regression tests for the chat response renderer.
+
+render_markdown is checked against format_response as it was in the original
+UI.py (reproduced below as baseline_format_response). The intended differences are:
+agent text is HTML-escaped first, consecutive list items share one <ul>, and code
+block contents are left verbatim.
+"""
+
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from formatting import HTML_ESCAPES, render_markdown
+
+# format_response from the original UI.py, unchanged
+def baseline_format_response(response: str) -> str:
+    """Format the agent response with proper styling"""
+    # Code blocks
+    response = re.sub(r'```(\w+)?\n(.*?)```', r'<div class="code-block">\2</div>', response, flags=re.DOTALL)
+    
+    # Headers
+    response = re.sub(r'^# (.*)', r'<h2 style="color: #e2e8f0; margin: 1.5rem 0 0.75rem 0; font-size: 1.5rem;">\1</h2>', response, flags=re.MULTILINE)
+    response = re.sub(r'^## (.*)', r'<h3 style="color: #e2e8f0; margin: 1.25rem 0 0.5rem 0; font-size: 1.25rem;">\1</h3>', response, flags=re.MULTILINE)
+    response = re.sub(r'^### (.*)', r'<h4 style="color: #e2e8f0; margin: 1rem 0 0.5rem 0; font-size: 1.1rem;">\1</h4>', response, flags=re.MULTILINE)
+    
+    # Lists
+    response = re.sub(r'^- (.*)', r'<li style="margin-bottom: 0.5rem; color: #cbd5e1;">\1</li>', response, flags=re.MULTILINE)
+    response = re.sub(r'(<li.*?</li>)', r'<ul style="margin: 0.5rem 0; padding-left: 1.5rem;">\1</ul>', response)
+    
+    # Bold and italic
+    response = re.sub(r'\*\*(.*?)\*\*', r'<strong style="color: #f1f5f9;">\1</strong>', response)
+    response = re.sub(r'\*(.*?)\*', r'<em>\1</em>', response)
+    
+    return response
+
+# The baseline wrapped every list item in its own <ul>; joining adjacent lists gives one <ul> per run of items
+ADJACENT_LISTS = '</ul>\n<ul style="margin: 0.5rem 0; padding-left: 1.5rem;">'
+
+def expected_html(text: str) -> str:
+    """The baseline output for text, with the intended differences applied"""
+    return baseline_format_response(text.translate(HTML_ESCAPES)).replace(ADJACENT_LISTS, "\n")
+
+# Corpus building blocks; code lines carry no markdown, since the baseline rendered it inside code
+WORDS = ["plain", "two words", "**bold**", "*italic*", "*a **b** c*", "<tag>", "a & b", "x*y", "**", "*", "-", "#"]
+CODE_LINES = ["x = 1", "SELECT * FROM t WHERE a < 3", "y = a & b", "print('<b>')", ""]
+
+def _random_line(rng):
+    body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 4)))
+    kind = rng.random()
+    if kind < 0.2:
+        return "#" * rng.randint(1, 4) + " " + body
+    if kind < 0.45:
+        return "- " + body
+    return body
+
+def _random_code_block(rng):
+    lines = [rng.choice(CODE_LINES) for _ in range(rng.randint(0, 3))]
+    return "```" + rng.choice(["", "python", "sql"]) + "\n" + "\n".join(lines) + "\n```"
+
+def random_corpus(seed=0, size=5000):
+    rng = random.Random(seed)
+    for _ in range(size):
+        blocks = [_random_code_block(rng) if rng.random() < 0.15 else _random_line(rng) for _ in range(rng.randint(1, 8))]
+        yield "\n".join(blocks)
+
+class RenderMarkdownTests(unittest.TestCase):
+    def test_matches_baseline_on_corpus(self):
+        for text in random_corpus():
+            self.assertEqual(render_markdown(text), expected_html(text), msg=repr(text))
+
+    def test_nested_emphasis(self):
+        self.assertEqual(
+            render_markdown("*a **b** c*"),
+            '<em>a <strong style="color: #f1f5f9;">b</strong> c</em>',
+        )
+
+    def test_fences_next_to_headers_and_lists(self):
+        text = "# Title\n```sql\nSELECT 1\n```\n- one\n- two\n```\nx = 1\n```"
+        self.assertEqual(render_markdown(text), expected_html(text))
+        self.assertEqual(render_markdown(text).count('<div class="code-block">'), 2)
+
+    def test_code_block_contents_are_verbatim(self):
+        html = render_markdown("```\n# not a header\n- not an item *x*\n```")
+        self.assertEqual(html, '<div class="code-block"># not a header\n- not an item *x*\n</div>')
+
+    def test_html_is_escaped(self):
+        self.assertEqual(render_markdown("<script>&</script>"), "&lt;script&gt;&amp;&lt;/script&gt;")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Tests for the MCP server's tool helpers.
+
+src/mcp.py is loaded as mcp_server without connecting to PostgreSQL.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+import unittest
+from unittest import mock
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def load_mcp_server():
+    """Load src/mcp.py as the module mcp_server, with the database connection skipped"""
+    # The file shares its name with the mcp package it imports, so import the package
+    # while src is off the path; later imports find it in sys.modules
+    saved_path = sys.path[:]
+    sys.path[:] = [path for path in sys.path if os.path.abspath(path or ".") != SRC]
+    try:
+        importlib.import_module("mcp.server.fastmcp")
+    finally:
+        sys.path[:] = saved_path
+    if SRC not in sys.path:
+        sys.path.append(SRC)
+
+    from postgres_db import PostgreSQLManager
+    spec = importlib.util.spec_from_file_location("mcp_server", os.path.join(SRC, "mcp.py"))
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.object(PostgreSQLManager, "_connect"):
+        spec.loader.exec_module(module)
+    return module
+
+server = load_mcp_server()
+
+def to_markdown(html: str) -> str:
+    """html_to_markdown with runs of blank lines collapsed, as visit_webpage does"""
+    return server._MULTI_NL_RE.sub("\n\n", server.html_to_markdown(html))
+
+@unittest.skipIf(server._html_parser() is None, "selectolax is not installed")
+class HtmlToMarkdownTests(unittest.TestCase):
+    def test_table_rows_and_cells(self):
+        html = "<table><tr><th>Name</th><th>Age</th></tr><tr><td>Ann</td><td>3|4</td></tr></table>"
+        self.assertEqual(to_markdown(html), "| Name | Age |\n| --- | --- |\n| Ann | 3\\|4 |")
+
+    def test_nested_lists_are_indented(self):
+        html = "<ul><li>one<ul><li>one.a</li><li>one.b</li></ul></li><li>two</li></ul><ol><li>x</li><li>y</li></ol>"
+        self.assertEqual(to_markdown(html), "- one\n    - one.a\n    - one.b\n- two\n\n1. x\n2. y")
+
+    def test_code_blocks_keep_their_text(self):
+        html = "<p>Run:</p><pre><code>x = 1\nif x:\n    print(x)\n</code></pre>"
+        self.assertEqual(to_markdown(html), "Run:\n\n```\nx = 1\nif x:\n    print(x)\n```")
+
+    def test_deeply_nested_page_falls_back(self):
+        # Deeper than the recursion limit of the DOM walk
+        html = "<div>" * 5000 + "deep text" + "</div>" * 5000
+        self.assertIn("deep text", server.html_to_markdown(html))
+
+class FakeResponse:
+    """Just enough of requests.Response for visit_webpage"""
+
+    def __init__(self, status_code: int, body: bytes = b"", headers: dict = None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.encoding = "utf-8"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size: int):
+        yield self.body
+
+@unittest.skipIf(server._html_parser() is None, "selectolax is not installed")
+class VisitWebpageCacheTests(unittest.TestCase):
+    URL = "https://example.com/page"
+
+    def setUp(self):
+        self.session = mock.Mock()
+        self.cache = server.LRUCache(4)
+        for name, value in [("_http_session", lambda: self.session), ("_webpage_cache", lambda: self.cache)]:
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_not_modified_page_is_served_from_cache(self):
+        self.session.get.side_effect = [
+            FakeResponse(200, b"<h1>Hello</h1>", {"ETag": '"v1"', "Last-Modified": "Mon, 12 Oct 2026 10:00:00 GMT"}),
+            FakeResponse(304),
+        ]
+        first = server.visit_webpage(self.URL)
+        second = server.visit_webpage(self.URL)
+        self.assertIn("# Hello", first)
+        self.assertEqual(second, first)
+        self.assertEqual(
+            self.session.get.call_args.kwargs["headers"],
+            {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 12 Oct 2026 10:00:00 GMT"},
+        )
+
+    def test_changed_page_replaces_cached_copy(self):
+        self.session.get.side_effect = [
+            FakeResponse(200, b"<p>old</p>", {"ETag": '"v1"'}),
+            FakeResponse(200, b"<p>new</p>", {"ETag": '"v2"'}),
+        ]
+        server.visit_webpage(self.URL)
+        self.assertIn("new", server.visit_webpage(self.URL))
+        self.assertEqual(self.cache.get(self.URL)["etag"], '"v2"')
+
+    def test_pages_without_validators_are_not_cached(self):
+        self.session.get.return_value = FakeResponse(200, b"<p>text</p>")
+        server.visit_webpage(self.URL)
+        self.assertIsNone(self.cache.get(self.URL))
+
+class IsSelectTests(unittest.TestCase):
+    def test_select_statements(self):
+        for query in ["SELECT 1", "select * from t", "  \n\tSelect\nid FROM t", "SELECT(1)", "SELECT*FROM t", "SELECT"]:
+            self.assertTrue(server._is_select(query), msg=repr(query))
+
+    def test_other_statements(self):
+        for query in ["", "   ", "DELETE FROM t", "SELECTED", "selection", "WITH x AS (SELECT 1) SELECT * FROM x", "-- SELECT"]:
+            self.assertFalse(server._is_select(query), msg=repr(query))
+
+    def test_long_queries_are_rejected_before_the_check(self):
+        query = "SELECT " + "x" * server.MAX_QUERY_LENGTH
+        self.assertIn(f"longer than {server.MAX_QUERY_LENGTH} characters", server.execute_select_query(query))
+
+class YouTubeIdTests(unittest.TestCase):
+    def video_id(self, url: str):
+        match = server._YT_ID_RE.search(url)
+        return match.group(1) if match else None
+
+    def test_supported_url_forms(self):
+        for url in [
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42",
+            "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://youtu.be/dQw4w9WgXcQ?si=abc",
+            "https://www.youtube.com/embed/dQw4w9WgXcQ",
+            "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+            "https://www.youtube.com/v/dQw4w9WgXcQ",
+            "https://www.youtube.com/live/dQw4w9WgXcQ",
+        ]:
+            self.assertEqual(self.video_id(url), "dQw4w9WgXcQ", msg=url)
+
+    def test_other_urls_are_rejected(self):
+        for url in [
+            "https://example.com/abcdefghijk",
+            "https://example.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/channel/UCabcdefghijk",
+            "https://www.youtube.com/watch?v=tooshort",
+            "https://youtu.be/dQw4w9WgXcQextra",
+        ]:
+            self.assertIsNone(self.video_id(url), msg=url)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Tests for the in-memory LRU cache that stands in for diskcache.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from memory_cache import LRUCache
+
+class LRUCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(cache.get("a"), 1)  # 'b' is now the least recently used
+        cache["c"] = 3
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_expired_entries_are_dropped(self):
+        cache = LRUCache(4)
+        cache.set("a", 1, expire=0.01)
+        cache.set("b", 2)
+        time.sleep(0.02)
+        self.assertEqual(cache.get("a", "missing"), "missing")
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_concurrent_writers_stay_within_bound(self):
+        cache = LRUCache(16)
+
+        def write(offset):
+            for i in range(2000):
+                cache[offset + i] = i
+                cache.get(offset + i // 2)
+
+        threads = [threading.Thread(target=write, args=(n * 10000,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 16)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Tests for PostgreSQLManager's statement and schema caches.
+
+The manager is built without connecting; an in-memory SQLite engine supplies
+the dialect used for identifier quoting.
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from sqlalchemy import create_engine, inspect, text
+
+import postgres_db
+from postgres_db import PostgreSQLManager
+
+def make_manager() -> PostgreSQLManager:
+    """A PostgreSQLManager on an in-memory SQLite engine, without the PostgreSQL connection"""
+    with mock.patch.object(PostgreSQLManager, "_connect"):
+        manager = PostgreSQLManager()
+    manager.engine = create_engine("sqlite://")
+    return manager
+
+class TableStatementTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+
+    def test_table_name_is_quoted(self):
+        statement = self.manager._table_statement(postgres_db.COUNT_SQL, 'my "table"')
+        self.assertIn('"my ""table"""', str(statement))
+
+    def test_statements_are_reused(self):
+        first = self.manager._table_statement(postgres_db.COUNT_SQL, "users")
+        self.assertIs(self.manager._table_statement(postgres_db.COUNT_SQL, "users"), first)
+
+    def test_cache_is_bounded(self):
+        for i in range(postgres_db.TABLE_STATEMENT_CACHE_SIZE + 10):
+            self.manager._table_statement(postgres_db.COUNT_SQL, f"t{i}")
+        self.assertEqual(len(self.manager._table_statements), postgres_db.TABLE_STATEMENT_CACHE_SIZE)
+        self.assertNotIn((postgres_db.COUNT_SQL, "t0"), self.manager._table_statements)
+
+    def test_concurrent_lookups_and_invalidation(self):
+        errors = []
+
+        def build(offset):
+            try:
+                for i in range(2000):
+                    self.manager._table_statement(postgres_db.COUNT_SQL, f"t{offset + i}")
+                    if i % 100 == 0:
+                        self.manager.invalidate_schema_cache(f"t{offset + i}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=build, args=(n * 10000,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(self.manager._table_statements), postgres_db.TABLE_STATEMENT_CACHE_SIZE)
+
+    def test_invalidate_drops_one_table_or_all(self):
+        self.manager._table_statement(postgres_db.COUNT_SQL, "users")
+        self.manager._table_statement(postgres_db.COUNT_SQL, "posts")
+        self.manager.invalidate_schema_cache("users")
+        self.assertEqual(list(self.manager._table_statements), [(postgres_db.COUNT_SQL, "posts")])
+        self.manager.invalidate_schema_cache()
+        self.assertEqual(self.manager._table_statements, {})
+
+class SchemaCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+
+    def test_invalidate_one_table(self):
+        self.manager._schema_cache[("users", 1)] = "users schema"
+        self.manager._schema_cache[("posts", 1)] = "posts schema"
+        self.manager.invalidate_schema_cache("users")
+        self.assertEqual(self.manager._schema_cache, {("posts", 1): "posts schema"})
+
+    def test_invalidate_while_other_threads_add_entries(self):
+        errors = []
+        done = threading.Event()
+
+        def fill(offset):
+            i = 0
+            while not done.is_set():
+                with self.manager._cache_lock:
+                    self.manager._schema_cache[(f"t{offset + i % 1000}", 1)] = None
+                i += 1
+
+        def invalidate():
+            try:
+                for i in range(500):
+                    self.manager.invalidate_schema_cache(f"t{i}")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        threads = [threading.Thread(target=fill, args=(n * 1000,)) for n in range(4)]
+        threads.append(threading.Thread(target=invalidate))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+class DatabaseSchemaTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        with self.manager.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL)"))
+            conn.execute(text("CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(id), title TEXT)"))
+            conn.execute(text("CREATE INDEX ix_posts_title ON posts (title)"))
+        # The schema version query is PostgreSQL-specific, so skip the check
+        self.manager._inspector = inspect(self.manager.engine)
+        self.manager._version_checked_at = float("inf")
+
+    def test_bulk_reflection(self):
+        schema = self.manager.get_database_schema()
+        self.assertEqual(sorted(schema.tables), ["posts", "users"])
+        self.assertEqual(schema.total_tables, 2)
+
+        users = schema.tables["users"]
+        self.assertEqual([(col.name, col.type) for col in users.columns], [("id", "INTEGER"), ("name", "VARCHAR(255)")])
+        self.assertEqual(users.primary_keys, ["id"])
+
+        posts = schema.tables["posts"]
+        self.assertEqual(posts.foreign_keys[0].referred_table, "users")
+        self.assertEqual(posts.indexes[0].columns, ["title"])
+
+    def test_bulk_reflection_seeds_the_table_cache(self):
+        schema = self.manager.get_database_schema()
+        self.assertIs(self.manager.get_table_schema("users"), schema.tables["users"])
+
+class TableStatisticsBundleTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        with self.manager.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(255))"))
+            conn.execute(text("INSERT INTO users (name) VALUES ('a'), ('b'), ('c')"))
+        # SQLite has no planner estimate, so the bundle falls back to an exact count
+        patcher = mock.patch.object(postgres_db, "ROW_ESTIMATE_SQL", text("SELECT NULL WHERE :table_name IS NULL"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_schema_and_count_together(self):
+        stats = self.manager.get_table_statistics_bundle("users")
+        self.assertEqual([col.name for col in stats.columns], ["id", "name"])
+        self.assertEqual((stats.row_count, stats.row_count_exact), (3, True))
+
+    def test_known_schema_is_reused(self):
+        schema = self.manager.get_table_statistics_bundle("users")
+        with mock.patch.object(self.manager, "_read_table_schema") as read_schema:
+            stats = self.manager.get_table_statistics_bundle("users", schema)
+        read_schema.assert_not_called()
+        self.assertEqual(stats.row_count, 3)
+        self.assertIsNot(stats, schema)
+
+    def test_missing_table(self):
+        stats = self.manager.get_table_statistics_bundle("missing")
+        self.assertEqual(stats.columns, [])
+        self.assertIsNone(stats.row_count)
+
+class RowCountTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.conn = mock.Mock()
+
+    def test_uses_planner_estimate(self):
+        self.conn.execute.return_value.scalar.return_value = 1200
+        self.assertEqual(self.manager._row_count(self.conn, "users"), (1200, False))
+        self.assertEqual(self.conn.execute.call_count, 1)
+
+    def test_counts_exactly_without_statistics(self):
+        # reltuples is -1 (or 0) until the table is first analyzed
+        self.conn.execute.return_value.scalar.side_effect = [-1, 7]
+        self.assertEqual(self.manager._row_count(self.conn, "users"), (7, True))
+        self.assertEqual('SELECT COUNT(*) FROM users', str(self.conn.execute.call_args[0][0]))
+
+class ExecuteQueryTests(unittest.TestCase):
+    QUERY = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 2500) SELECT i FROM n"
+
+    def setUp(self):
+        self.manager = make_manager()
+
+    def test_materialized_result(self):
+        result = self.manager.execute_query(self.QUERY)
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.data), 2500)
+        self.assertEqual(result.row_count, 2500)
+
+    def test_streamed_result_keeps_max_rows(self):
+        result = self.manager.execute_query(self.QUERY, stream=True, max_rows=3)
+        self.assertTrue(result.success)
+        self.assertEqual(result.columns, ["i"])
+        self.assertEqual(result.data, [{"i": 1}, {"i": 2}, {"i": 3}])
+        self.assertEqual(result.row_count, 2500)
+
+    def test_streamed_result_without_limit(self):
+        result = self.manager.execute_query(self.QUERY, stream=True)
+        self.assertEqual(len(result.data), 2500)
+
+    def test_sql_error(self):
+        result = self.manager.execute_query("SELECT * FROM missing_table", stream=True)
+        self.assertFalse(result.success)
+        self.assertTrue(result.error.startswith("SQL Error:"))
+
+if __name__ == "__main__":
+    unittest.main()